@@ -0,0 +1,198 @@
+"""End-to-end benchmarks for the GivEVC hot paths.
+
+Runs the integration's own transport, planner, decoder, write queue and
+discovery code against simulated chargers (see ``simulator.py``) and prints
+timings, so regressions show up before they reach a real site. The modules
+are loaded without the integration's package ``__init__``, so no Home
+Assistant instance is set up; only pymodbus, voluptuous and the
+``homeassistant`` package (for its dt and exceptions helpers) are needed::
+
+    python benchmarks/bench.py
+    python benchmarks/bench.py --latency 0.005 --polls 500 > bench_output.txt
+"""
+
+import argparse
+import asyncio
+import importlib
+import statistics
+import sys
+import time
+import types
+from array import array
+from pathlib import Path
+
+INTEGRATION = Path(__file__).parent.parent / "custom_components" / "givevc"
+sys.path.insert(0, str(Path(__file__).parent))
+
+# An empty package over the integration's directory, so its modules and their
+# relative imports load without running __init__.py and its Home Assistant
+# setup code
+_package = types.ModuleType("givevc")
+_package.__path__ = [str(INTEGRATION)]
+sys.modules["givevc"] = _package
+
+ModbusConnection = importlib.import_module("givevc.connection").ModbusConnection
+_const = importlib.import_module("givevc.const")
+DEFAULT_MAX_BLOCK_SIZE, DEFAULT_MAX_GAP = _const.DEFAULT_MAX_BLOCK_SIZE, _const.DEFAULT_MAX_GAP
+DecodePlan = importlib.import_module("givevc.decoder").DecodePlan
+async_discover_evc = importlib.import_module("givevc.findEVC").async_discover_evc
+PollMetrics = importlib.import_module("givevc.metrics").PollMetrics
+plan_tiers = importlib.import_module("givevc.planner").plan_tiers
+load_register_map = importlib.import_module("givevc.register_map").load_register_map
+WriteQueue = importlib.import_module("givevc.write_queue").WriteQueue
+
+from simulator import REGISTER_MAP, ChargerSimulator  # noqa: E402
+
+
+def _summary(name, samples, unit="ms", scale=1000.0):
+    samples = sorted(sample * scale for sample in samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(
+        f"{name:<28} n={len(samples):<6} mean={statistics.fmean(samples):9.3f}{unit} "
+        f"p50={statistics.median(samples):9.3f}{unit} p95={p95:9.3f}{unit} max={samples[-1]:9.3f}{unit}"
+    )
+
+
+def _register_map():
+    return load_register_map(REGISTER_MAP)
+
+
+async def bench_poll(args, register_map):
+    """Time a full poll of every planned block over one shared connection."""
+    blocks = plan_tiers(register_map, 30, DEFAULT_MAX_BLOCK_SIZE, DEFAULT_MAX_GAP)
+    async with ChargerSimulator(port=0, latency=args.latency) as simulator:
+        connection = ModbusConnection(simulator.host, simulator.port)
+        samples = []
+        for _ in range(args.polls):
+            start = time.perf_counter()
+            for address, count, _ in blocks:
+                await connection.read_holding_registers(address, count)
+            samples.append(time.perf_counter() - start)
+        await connection.close()
+    _summary(f"poll ({len(blocks)} blocks)", samples)
+
+
+async def bench_faults(args, register_map):
+    """Poll through dropped connections and exception responses."""
+    blocks = plan_tiers(register_map, 30, DEFAULT_MAX_BLOCK_SIZE, DEFAULT_MAX_GAP)
+    async with ChargerSimulator(
+        port=0, latency=args.latency, drop_rate=0.02, exception_rate=0.02
+    ) as simulator:
+        connection = ModbusConnection(simulator.host, simulator.port, timeout=0.5)
+        ok = failed = 0
+        samples = []
+        for _ in range(args.polls):
+            start = time.perf_counter()
+            try:
+                for address, count, _ in blocks:
+                    result = await connection.read_holding_registers(address, count)
+                    if result.isError():
+                        raise ConnectionError(result)
+                ok += 1
+                samples.append(time.perf_counter() - start)
+            except Exception:
+                failed += 1
+                if connection.retry_after:
+                    # Start afresh rather than wait out the reconnect
+                    # backoff, which is not what is measured here
+                    await connection.close()
+                    connection = ModbusConnection(simulator.host, simulator.port, timeout=0.5)
+        await connection.close()
+        print(
+            f"{'faults (2% drop, 2% exc)':<28} ok={ok} failed={failed} "
+            f"connections={simulator.connections}"
+        )
+    if samples:
+        _summary("poll under faults", samples)
+
+
+def bench_decode(args, register_map):
+    """Time decoding one register image into the entity value table."""
+    image = array("H", ChargerSimulator().registers)
+    plan = DecodePlan(register_map)
+    samples = []
+    for _ in range(args.decodes):
+        start = time.perf_counter()
+        plan.decode(image)
+        samples.append(time.perf_counter() - start)
+    _summary(f"decode ({len(register_map)} entries)", samples, "us", 1e6)
+
+
+class _QueueHost:
+    """The parts of ModbusCoordinator that WriteQueue relies on."""
+
+    def __init__(self, connection):
+        self.hass = self
+        self.host = connection.host
+        self.connection = connection
+        self.io_lock = asyncio.Lock()
+        self.metrics = PollMetrics()
+
+    def async_create_task(self, coro):
+        return asyncio.get_running_loop().create_task(coro)
+
+    def async_apply_registers(self, registers):
+        pass
+
+
+async def bench_write(args):
+    """Time a write through the queue until its read-back completes."""
+    async with ChargerSimulator(port=0, latency=args.latency) as simulator:
+        connection = ModbusConnection(simulator.host, simulator.port)
+        queue = WriteQueue(_QueueHost(connection))
+        samples = []
+        for value in range(args.writes):
+            start = time.perf_counter()
+            await queue.async_write(91, [60 + value % 260])
+            samples.append(time.perf_counter() - start)
+        _summary("write -> read-back", samples)
+
+        # A burst of writes to one register coalesces into a single batch
+        requests = simulator.requests
+        start = time.perf_counter()
+        await asyncio.gather(*(queue.async_write(91, [60 + value]) for value in range(50)))
+        elapsed = time.perf_counter() - start
+        print(
+            f"{'burst of 50 writes':<28} {elapsed * 1000:9.3f}ms "
+            f"modbus requests={simulator.requests - requests}"
+        )
+        await connection.close()
+
+
+async def bench_discovery(args):
+    """Time discovery of simulated chargers across a synthetic /24."""
+    subnet = "127.0.77.0/24"
+    simulators = [
+        ChargerSimulator(f"127.0.77.{10 + index * 20}", args.port, serial=f"SIM{index:07d}")
+        for index in range(args.chargers)
+    ]
+    for simulator in simulators:
+        await simulator.start()
+    try:
+        start = time.perf_counter()
+        found = await async_discover_evc(subnet, args.port)
+        elapsed = time.perf_counter() - start
+    finally:
+        for simulator in simulators:
+            await simulator.stop()
+    print(f"{'discovery ' + subnet:<28} {elapsed * 1000:9.3f}ms found={len(found)}/{len(simulators)}")
+
+
+async def _main(args):
+    register_map = _register_map()
+    await bench_poll(args, register_map)
+    await bench_faults(args, register_map)
+    bench_decode(args, register_map)
+    await bench_write(args)
+    await bench_discovery(args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated response latency (s)")
+    parser.add_argument("--polls", type=int, default=200)
+    parser.add_argument("--decodes", type=int, default=5000)
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument("--chargers", type=int, default=3)
+    parser.add_argument("--port", type=int, default=15020, help="port for discovery simulators")
+    asyncio.run(_main(parser.parse_args()))
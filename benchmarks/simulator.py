@@ -0,0 +1,190 @@
+"""Offline GivEVC charger simulator.
+
+A small Modbus TCP server that stands in for a charger. It serves holding
+registers (function code 3) and accepts writes (function codes 6 and 16),
+with values seeded from ``register_map.json`` and a serial number at the
+registers the integration reads during discovery. Faults can be injected to
+exercise the integration's error handling:
+
+* ``latency`` / ``jitter``: delay (seconds) before every response
+* ``drop_rate``: probability of closing the connection instead of answering
+* ``exception_rate``: probability of answering with a Modbus exception
+
+Run one from the command line::
+
+    python benchmarks/simulator.py --host 127.0.0.1 --port 5020 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import struct
+from pathlib import Path
+
+_LOGGER = logging.getLogger(__name__)
+
+REGISTER_MAP = Path(__file__).parent.parent / "custom_components" / "givevc" / "register_map.json"
+REGISTER_COUNT = 256
+SERIAL_REGISTER = 38
+
+# Modbus exception codes
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_ADDRESS = 0x02
+DEVICE_FAILURE = 0x04
+
+_MBAP = struct.Struct(">HHHB")
+
+
+def seed_registers(serial="SIM0000001", register_map=REGISTER_MAP):
+    """Return a register image with plausible values for every map entry."""
+    registers = [0] * REGISTER_COUNT
+    with Path(register_map).open() as f:
+        entries = json.load(f)
+    for config in entries:
+        register = int(config["register"], 0) if isinstance(config["register"], str) else config["register"]
+        if config.get("type") == "timestamp":
+            registers[register] = 12
+            registers[config.get("register_minute", register + 1)] = 34
+            registers[config.get("register_second", register + 2)] = 56
+        elif config.get("lookup"):
+            registers[register] = int(next(iter(config["lookup"])))
+        elif config.get("byte_order") or config.get("float"):
+            registers[register + 1] = 1500
+        else:
+            registers[register] = int(config.get("min", 10) / config.get("scale", 1))
+    for offset, char in enumerate(serial):
+        registers[SERIAL_REGISTER + offset] = ord(char)
+    return registers
+
+
+class ChargerSimulator:
+    """One simulated charger listening on ``host``:``port``."""
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=5020,
+        serial="SIM0000001",
+        latency=0.0,
+        jitter=0.0,
+        drop_rate=0.0,
+        exception_rate=0.0,
+    ):
+        self.host = host
+        self.port = port
+        self.serial = serial
+        self.registers = seed_registers(serial)
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.exception_rate = exception_rate
+        self.requests = 0
+        self.connections = 0
+        self._server = None
+        self._handlers = {}
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        if self.port == 0:
+            self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is None:
+            return
+        self._server.close()
+        # Closing each transport ends its handler with an EOF
+        handlers = dict(self._handlers)
+        for writer in handlers.values():
+            writer.close()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        task = asyncio.current_task()
+        self._handlers[task] = writer
+        try:
+            while True:
+                header = await reader.readexactly(_MBAP.size)
+                transaction, protocol, length, unit = _MBAP.unpack(header)
+                pdu = await reader.readexactly(length - 1)
+                self.requests += 1
+                delay = self.latency + random.uniform(0, self.jitter)
+                if delay:
+                    await asyncio.sleep(delay)
+                if random.random() < self.drop_rate:
+                    break
+                if random.random() < self.exception_rate:
+                    body = bytes([pdu[0] | 0x80, DEVICE_FAILURE])
+                else:
+                    body = self._respond(pdu)
+                writer.write(_MBAP.pack(transaction, protocol, len(body) + 1, unit) + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._handlers.pop(task, None)
+            writer.close()
+
+    def _respond(self, pdu):
+        function = pdu[0]
+        if function == 3:
+            address, count = struct.unpack_from(">HH", pdu, 1)
+            if not 1 <= count <= 125 or address + count > len(self.registers):
+                return bytes([function | 0x80, ILLEGAL_ADDRESS])
+            values = self.registers[address:address + count]
+            return struct.pack(f">BB{count}H", function, count * 2, *values)
+        if function == 6:
+            address, value = struct.unpack_from(">HH", pdu, 1)
+            if address >= len(self.registers):
+                return bytes([function | 0x80, ILLEGAL_ADDRESS])
+            self.registers[address] = value
+            return pdu[:5]
+        if function == 16:
+            address, count, _ = struct.unpack_from(">HHB", pdu, 1)
+            if address + count > len(self.registers):
+                return bytes([function | 0x80, ILLEGAL_ADDRESS])
+            self.registers[address:address + count] = struct.unpack_from(f">{count}H", pdu, 6)
+            return struct.pack(">BHH", function, address, count)
+        return bytes([function | 0x80, ILLEGAL_FUNCTION])
+
+
+async def _main(args):
+    simulator = ChargerSimulator(
+        args.host,
+        args.port,
+        serial=args.serial,
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop_rate,
+        exception_rate=args.exception_rate,
+    )
+    async with simulator:
+        _LOGGER.warning("Simulated GivEVC %s on %s:%s", args.serial, args.host, simulator.port)
+        await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5020)
+    parser.add_argument("--serial", default="SIM0000001")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--exception-rate", type=float, default=0.0)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -1,66 +1,134 @@
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_ADAPTIVE,
+    CONF_DIVERSION_SOURCE,
+    CONF_MAX_BLOCK_SIZE,
+    CONF_MAX_GAP,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    DEFAULT_MAX_BLOCK_SIZE,
+    DEFAULT_MAX_GAP,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
+    HEALTH_PLATFORMS,
+)
 from .coordinator import ModbusCoordinator
+from .diversion import DiversionController
+from .fleet import async_get_fleet
+from .register_map import async_load_register_map
+from .services import async_setup_services, async_unload_services
 from homeassistant.core import HomeAssistant
-import json
-from pathlib import Path
+import asyncio
 import logging
+import time
 
 _LOGGER = logging.getLogger(__name__)
 
-def get_map():
-    # Try to load register_map.json from the integration directory and merge
-    # into the entry data. This allows users to change the file and have the
-    # integration pick up changes on Home Assistant restart.
-    try:
-        reg_file = Path(__file__).parent / "register_map.json"
-        if reg_file.exists():
-            with reg_file.open() as f:
-                reg_map = json.load(f)
-            return reg_map
-        else:
-            return []
-    except Exception:
-        _LOGGER.debug("Failed loading register_map.json; continuing without it")
+PLATFORMS = ["sensor", "binary_sensor", "number", "switch", "select"]
+
+
+def _ms(started):
+    return round(1000 * (time.perf_counter() - started), 3)
+
 
 async def async_setup_entry(hass, entry):
     """Set up the integration from a config entry.
 
-    Load a local register_map.json (if present) and update the config entry
-    data so platforms pick up the latest network map without re-running the
-    config flow.
+    The register map is read from register_map.json, validated and compiled
+    once per version of the file; edits are picked up when the entry is set
+    up again. Only the version of the map is kept in the entry data.
+
+    Only the platforms the map has entities for (plus those for health and
+    metrics) are set up, concurrently, and each step is timed into the
+    coordinator's setup profile.
     """
+    setup_started = time.perf_counter()
     hass.data.setdefault(DOMAIN, {})
-    config = dict(entry.data)
-    try:
-        # Normalize register fields (strings to ints where appropriate)
-        reg_map = await hass.async_add_executor_job(get_map)
-        parsed_map = []
-        for cfg in reg_map:
-            cfg_copy = dict(cfg)
-            reg_raw = cfg_copy.get("register")
-            try:
-                if isinstance(reg_raw, str):
-                    cfg_copy["register"] = int(reg_raw, 0)
-            except Exception:
-                _LOGGER.debug("Invalid register value in map: %s", reg_raw)
-            parsed_map.append(cfg_copy)
-        config["register_map"] = parsed_map
-        # Update the config entry so platforms see the map
+    register_map = await async_load_register_map(hass)
+    map_load_ms = _ms(setup_started)
+    config = {key: value for key, value in entry.data.items() if key != "register_map"}
+    config["register_map_version"] = register_map.digest
+    if config != dict(entry.data):
         hass.config_entries.async_update_entry(entry, data=config)
-    except Exception:
-        _LOGGER.debug("Failed processing register_map.json; continuing without it")
     coordinator = ModbusCoordinator(
         hass,
         host=config["host"],
         port=502,
         unit_id=1,
         scan_interval=config["scan_interval"],
-        register_count=60,
+        register_map=register_map,
+        max_block_size=entry.options.get(CONF_MAX_BLOCK_SIZE, DEFAULT_MAX_BLOCK_SIZE),
+        max_gap=entry.options.get(CONF_MAX_GAP, DEFAULT_MAX_GAP),
+        entry=entry,
+        fleet=async_get_fleet(hass),
+        adaptive=entry.options.get(CONF_ADAPTIVE, False),
+        min_interval=entry.options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+        max_interval=entry.options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL),
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    # With a saved register image the entities start from it, marked stale,
+    # and the first poll runs in the background instead of holding up setup
+    await coordinator.sessions.async_load()
+    poll_started = time.perf_counter()
+    warm_start = await coordinator.async_restore_image()
+    if not warm_start:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception:
+            await coordinator.connection.close()
+            raise
+    first_poll_ms = _ms(poll_started)
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    coordinator.fleet.add(coordinator)
+    if warm_start:
+        coordinator.fleet.async_reschedule(coordinator)
+    if entry.options.get(CONF_DIVERSION_SOURCE):
+        coordinator.diversion = DiversionController(hass, coordinator, entry.options)
+        coordinator.diversion.async_start()
+        entry.async_on_unload(coordinator.diversion.async_stop)
+    entry.async_on_unload(entry.add_update_listener(async_options_updated))
+    async_setup_services(hass)
+
+    platforms = [
+        platform for platform in PLATFORMS
+        if platform in HEALTH_PLATFORMS or platform in register_map.platforms
+    ]
+    platform_ms = {}
+
+    async def _async_forward(platform):
+        started = time.perf_counter()
+        await hass.config_entries.async_forward_entry_setups(entry, [platform])
+        coordinator.loaded_platforms.add(platform)
+        platform_ms[platform] = _ms(started)
+
+    await asyncio.gather(*(_async_forward(platform) for platform in platforms))
+    coordinator.setup_profile = {
+        "map_load_ms": map_load_ms,
+        "first_poll_ms": first_poll_ms,
+        "warm_start": warm_start,
+        "platforms_ms": platform_ms,
+        "total_ms": _ms(setup_started),
+    }
+    _LOGGER.debug("Set up %s in %.1f ms: %s", entry.title, coordinator.setup_profile["total_ms"], platform_ms)
+    return True
+
+async def async_options_updated(hass, entry):
+    """Reload the entry when its options change.
+
+    Data updates (such as a rediscovered host) also land here; those are
+    already applied in place and do not need a reload.
+    """
+    coordinator = hass.data[DOMAIN].get(entry.entry_id)
+    if coordinator is not None and coordinator.options != dict(entry.options):
+        await hass.config_entries.async_reload(entry.entry_id)
 
-    for platform in ["sensor", "number", "switch", "select"]:
-        hass.async_create_task(hass.config_entries._async_forward_entry_setup(entry, platform,False))
-    return True
\ No newline at end of file
+async def async_unload_entry(hass, entry):
+    """Unload platforms and close the entry's Modbus connection."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, coordinator.loaded_platforms)
+    if unload_ok:
+        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator.fleet.remove(coordinator)
+        await coordinator.async_shutdown()
+        async_unload_services(hass)
+    return unload_ok
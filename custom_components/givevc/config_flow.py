@@ -3,22 +3,60 @@ import logging
 import ipaddress
 import voluptuous as vol
 from homeassistant import config_entries
-from .const import DOMAIN
-from pymodbus.client import ModbusTcpClient
-from .findEVC import findEVC
+from homeassistant.core import callback
+from homeassistant.helpers import selector
+from .const import (
+    DOMAIN,
+    CONF_ADAPTIVE,
+    CONF_DIVERSION_HYSTERESIS,
+    CONF_DIVERSION_KI,
+    CONF_DIVERSION_KP,
+    CONF_DIVERSION_MIN_DWELL,
+    CONF_DIVERSION_PHASES,
+    CONF_DIVERSION_SOURCE,
+    CONF_DIVERSION_TARGET,
+    CONF_MAX_BLOCK_SIZE,
+    CONF_MAX_GAP,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONF_TARIFF,
+    CONF_TARIFF_ENTITY,
+    DEFAULT_DIVERSION_HYSTERESIS,
+    DEFAULT_DIVERSION_KI,
+    DEFAULT_DIVERSION_KP,
+    DEFAULT_DIVERSION_MIN_DWELL,
+    DEFAULT_DIVERSION_PHASES,
+    DEFAULT_DIVERSION_TARGET,
+    DEFAULT_MAX_BLOCK_SIZE,
+    DEFAULT_MAX_GAP,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_TARIFF,
+)
+from .discovery import async_get_discovery_cache
+from .findEVC import async_discover_evc, async_get_serial, async_probe_evc
+from .planner import MODBUS_MAX_READ
 
 _LOGGER = logging.getLogger(__name__)
 
+SCAN_INTERVAL_SCHEMA = vol.All(vol.Coerce(int), vol.Range(min=5, max=3600))
+
 class ModbusBlockConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return GivEVCOptionsFlow(config_entry)
+
     async def async_step_user(self, user_input=None):
         if user_input is not None:
-            serial = await self.hass.async_add_executor_job(
-            get_modbus_serial, user_input["host"]
-            )
+            serial = await async_get_serial(user_input["host"])
             user_input["serial"] = serial
             if serial:
+                (await async_get_discovery_cache(self.hass)).seen(serial, user_input["host"])
+                await self.async_set_unique_id(serial)
+                self._abort_if_unique_id_configured(updates={"host": user_input["host"]})
                 return self.async_create_entry(
                     title=f"GivEVC ({serial})",
                     data=user_input,
@@ -28,18 +66,23 @@ class ModbusBlockConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     step_id="user",
                     data_schema=vol.Schema({
                         vol.Required("host"): str,
-                        vol.Required("scan_interval", default=30): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600))
+                        vol.Required("scan_interval", default=30): SCAN_INTERVAL_SCHEMA
                     }),
                     errors={"base": "IP Address is not as valid GivEVC device"}
                 )
 
         found = await scan_subnet_for_modbus(self)
         if found:
+            # Let the user pick any of the chargers found on the subnet
+            chargers = {
+                charger["host"]: f"{charger['serial']} ({charger['host']})"
+                for charger in found
+            }
             return self.async_show_form(
                 step_id="user",
                 data_schema=vol.Schema({
-                    vol.Required("host"): (found),
-                    vol.Required("scan_interval", default=30): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600))
+                    vol.Required("host", default=found[0]["host"]): vol.In(chargers),
+                    vol.Required("scan_interval", default=30): SCAN_INTERVAL_SCHEMA
                 })
             )
         else:
@@ -47,28 +90,100 @@ class ModbusBlockConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 step_id="user",
                 data_schema=vol.Schema({
                     vol.Required("host"): str,
-                    vol.Required("scan_interval", default=30): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600))
+                    vol.Required("scan_interval", default=30): SCAN_INTERVAL_SCHEMA
                 }),
                 errors={"base": "No Devices found on subnet, please enter manually"}
             )
 
-def get_modbus_serial(ip):
-    try:
-        client = ModbusTcpClient(ip)
-        result = client.read_holding_registers(38, count=32)
-        client.close()
+class GivEVCOptionsFlow(config_entries.OptionsFlow):
+    """Read planning, adaptive polling, solar diversion and tariff settings for an existing charger."""
+
+    def __init__(self, config_entry):
+        self._entry = config_entry
 
-        if result.isError() or not result.registers:
-            return None
-        serial = ""
-        for reg in result.registers:
-            if not reg == 0:
-                serial = serial + chr(reg)
-        return serial if serial else None
-    except Exception:
-        return None
+    async def async_step_init(self, user_input=None):
+        errors = {}
+        if user_input is not None:
+            if user_input[CONF_MIN_INTERVAL] > user_input[CONF_MAX_INTERVAL]:
+                errors["base"] = "Minimum interval must not be above the maximum interval"
+            else:
+                options = {**self._entry.options, **user_input}
+                # Clearing the source entity turns solar diversion off
+                if CONF_DIVERSION_SOURCE not in user_input:
+                    options.pop(CONF_DIVERSION_SOURCE, None)
+                if CONF_TARIFF_ENTITY not in user_input:
+                    options.pop(CONF_TARIFF_ENTITY, None)
+                return self.async_create_entry(title="", data=options)
+
+        options = user_input or self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Required(
+                    CONF_MAX_BLOCK_SIZE, default=options.get(CONF_MAX_BLOCK_SIZE, DEFAULT_MAX_BLOCK_SIZE)
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=MODBUS_MAX_READ)),
+                vol.Required(
+                    CONF_MAX_GAP, default=options.get(CONF_MAX_GAP, DEFAULT_MAX_GAP)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MODBUS_MAX_READ)),
+                vol.Required(CONF_ADAPTIVE, default=options.get(CONF_ADAPTIVE, False)): bool,
+                vol.Required(
+                    CONF_MIN_INTERVAL, default=options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL)
+                ): SCAN_INTERVAL_SCHEMA,
+                vol.Required(
+                    CONF_MAX_INTERVAL, default=options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL)
+                ): SCAN_INTERVAL_SCHEMA,
+                vol.Optional(
+                    CONF_DIVERSION_SOURCE,
+                    description={"suggested_value": options.get(CONF_DIVERSION_SOURCE)},
+                ): selector.EntitySelector(selector.EntitySelectorConfig(domain="sensor")),
+                vol.Required(
+                    CONF_DIVERSION_TARGET,
+                    default=options.get(CONF_DIVERSION_TARGET, DEFAULT_DIVERSION_TARGET),
+                ): vol.Coerce(float),
+                vol.Required(
+                    CONF_DIVERSION_PHASES,
+                    default=options.get(CONF_DIVERSION_PHASES, DEFAULT_DIVERSION_PHASES),
+                ): vol.All(vol.Coerce(int), vol.In((1, 3))),
+                vol.Required(
+                    CONF_DIVERSION_KP, default=options.get(CONF_DIVERSION_KP, DEFAULT_DIVERSION_KP)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Required(
+                    CONF_DIVERSION_KI, default=options.get(CONF_DIVERSION_KI, DEFAULT_DIVERSION_KI)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Required(
+                    CONF_DIVERSION_HYSTERESIS,
+                    default=options.get(CONF_DIVERSION_HYSTERESIS, DEFAULT_DIVERSION_HYSTERESIS),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Required(
+                    CONF_DIVERSION_MIN_DWELL,
+                    default=options.get(CONF_DIVERSION_MIN_DWELL, DEFAULT_DIVERSION_MIN_DWELL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                vol.Required(
+                    CONF_TARIFF, default=options.get(CONF_TARIFF, DEFAULT_TARIFF)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_TARIFF_ENTITY,
+                    description={"suggested_value": options.get(CONF_TARIFF_ENTITY)},
+                ): selector.EntitySelector(selector.EntitySelectorConfig(domain="sensor")),
+            }),
+            errors=errors,
+        )
 
 async def scan_subnet_for_modbus(self):
+    # Chargers seen before are checked directly at their cached address; the
+    # subnet is only scanned when none of them is both new and still there.
+    cache = await async_get_discovery_cache(self.hass)
+    configured = self._async_current_ids()
+    cached = [
+        charger["host"] for charger in cache.chargers()
+        if charger["serial"] not in configured
+    ]
+    if cached:
+        found = await async_probe_evc(cached)
+        found = [charger for charger in found if charger["serial"] not in configured]
+        if found:
+            return found
+
     network={}
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -83,11 +198,8 @@ async def scan_subnet_for_modbus(self):
         _LOGGER.warning(f"Docker network info failed: {e}")
         return []
 
-    serial = []
-    evc=findEVC(network)
-    for ip in evc:
-        serial=get_modbus_serial(evc[ip])
-        if serial:
-            _LOGGER.warning(f"Found GivEVC {serial} at IP: {evc[ip]}")
-            return evc[ip]
-    return []
\ No newline at end of file
+    found = await async_discover_evc(network)
+    for charger in found:
+        _LOGGER.warning(f"Found GivEVC {charger['serial']} at IP: {charger['host']}")
+        cache.seen(charger["serial"], charger["host"])
+    return [charger for charger in found if charger["serial"] not in configured]
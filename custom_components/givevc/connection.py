@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import socket
+import time
+
+from pymodbus.client import AsyncModbusTcpClient
+
+_LOGGER = logging.getLogger(__name__)
+
+# Reconnect backoff bounds (seconds) and per-transaction deadline
+BACKOFF_MIN = 1.0
+BACKOFF_MAX = 60.0
+REQUEST_TIMEOUT = 5.0
+# A socket that has been idle longer than this is probed before it is trusted
+IDLE_PROBE_AFTER = 60.0
+
+
+class ModbusConnection:
+    """A single long-lived Modbus TCP client shared by everything on one entry.
+
+    The client is opened lazily on the first transaction and reopened with
+    exponential backoff after a failure. All transactions are serialised via
+    a lock, as the EVC only copes with one outstanding request at a time.
+
+    ``transact`` optionally wraps every request, e.g.
+    ``FleetScheduler.async_transact`` to cap requests across all chargers.
+    Connect times are recorded in ``metrics`` (a ``PollMetrics``) if given.
+    """
+
+    def __init__(self, host, port=502, timeout=REQUEST_TIMEOUT, transact=None, metrics=None):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.transact = transact
+        self.metrics = metrics
+        self.lock = asyncio.Lock()
+        self._client = None
+        self._backoff = 0.0
+        self._next_attempt = 0.0
+        self._last_io = 0.0
+        self._closed = False
+
+    @property
+    def connected(self):
+        return self._client is not None and self._client.connected
+
+    @property
+    def retry_after(self):
+        """Seconds until a reconnect is allowed, 0 if it is allowed now."""
+        if self._client is not None:
+            return 0.0
+        return max(0.0, self._next_attempt - time.monotonic())
+
+    async def _ensure_connected(self, timeout):
+        if self._closed:
+            raise ConnectionError("Modbus connection has been closed")
+        if self._client is not None:
+            if not self._client.connected or self._transport_closing():
+                _LOGGER.debug("Dropping stale Modbus socket to %s", self.host)
+                self._drop()
+            elif time.monotonic() - self._last_io > IDLE_PROBE_AFTER:
+                # Half-open sockets only show up on the next send, so probe
+                # a long-idle socket with a cheap read before relying on it.
+                try:
+                    await self._call(self._client.read_holding_registers, 0, count=1, timeout=timeout)
+                except Exception:
+                    _LOGGER.debug("Idle Modbus socket to %s failed probe", self.host)
+                    self._drop()
+        if self._client is not None:
+            return self._client
+
+        now = time.monotonic()
+        if now < self._next_attempt:
+            raise ConnectionError(f"Modbus reconnect backing off for {self._next_attempt - now:.1f}s")
+        client = AsyncModbusTcpClient(
+            host=self.host, port=self.port, timeout=self.timeout, retries=0
+        )
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(client.connect(), timeout)
+        except Exception:
+            client.close()
+            self._fail()
+            raise ConnectionError("Modbus client failed to connect")
+        if not client.connected:
+            client.close()
+            self._fail()
+            raise ConnectionError("Modbus client failed to connect")
+        if self.metrics is not None:
+            self.metrics.connect.add(time.perf_counter() - started)
+        self._client = client
+        self._backoff = 0.0
+        self._last_io = time.monotonic()
+        self._enable_keepalive()
+        return client
+
+    def _transport_closing(self):
+        transport = getattr(getattr(self._client, "ctx", None), "transport", None)
+        return transport is not None and transport.is_closing()
+
+    def _enable_keepalive(self):
+        transport = getattr(getattr(self._client, "ctx", None), "transport", None)
+        sock = transport.get_extra_info("socket") if transport is not None else None
+        if sock is None:
+            return
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        except OSError:
+            pass
+
+    def _fail(self):
+        self._backoff = min(BACKOFF_MAX, max(BACKOFF_MIN, self._backoff * 2))
+        self._next_attempt = time.monotonic() + self._backoff
+
+    def _drop(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def _call(self, func, *args, timeout=None, **kwargs):
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        if self.transact is not None:
+            result = await self.transact(self._timed, timeout, func, *args, **kwargs)
+        else:
+            result = await self._timed(timeout, func, *args, **kwargs)
+        self._last_io = time.monotonic()
+        return result
+
+    async def _timed(self, timeout, func, *args, **kwargs):
+        return await asyncio.wait_for(func(*args, **kwargs), timeout)
+
+    @staticmethod
+    def _remaining(deadline):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("Modbus request timed out")
+        return remaining
+
+    async def _transact(self, func_name, *args, timeout=None, **kwargs):
+        # Connecting, probing and the request itself all share one deadline
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        deadline = time.monotonic() + timeout
+        async with self.lock:
+            client = await self._ensure_connected(self._remaining(deadline))
+            remaining = self._remaining(deadline)
+            try:
+                return await self._call(getattr(client, func_name), *args, timeout=remaining, **kwargs)
+            except Exception:
+                # A timeout or transport error usually means the socket is
+                # half-open; throw it away so the next call reconnects.
+                self._drop()
+                self._fail()
+                raise
+
+    async def read_holding_registers(self, address, count, timeout=None):
+        """Read ``count`` registers; ``timeout`` can only shorten the default.
+
+        The timeout covers reconnecting as well as the request.
+        """
+        return await self._transact("read_holding_registers", address, count=count, timeout=timeout)
+
+    async def write_registers(self, address, values):
+        return await self._transact("write_registers", address, list(values))
+
+    async def async_set_host(self, host):
+        """Point the connection at a new address, e.g. after a DHCP change."""
+        async with self.lock:
+            self._drop()
+            self.host = host
+            self._backoff = 0.0
+            self._next_attempt = 0.0
+
+    async def close(self):
+        self._closed = True
+        async with self.lock:
+            self._drop()
@@ -1 +1,126 @@
-DOMAIN = "givevc"
\ No newline at end of file
+DOMAIN = "givevc"
+
+# hass.data[DOMAIN] maps entry ids to coordinators; objects shared by every
+# entry live under their own keys
+DATA_DISCOVERY = f"{DOMAIN}_discovery"
+DATA_FLEET = f"{DOMAIN}_fleet"
+
+# Read planning: largest block fetched in one request (the Modbus limit for
+# function code 3 is 125) and the widest run of unused registers that is
+# still read through rather than splitting the block. Both can be changed in
+# the integration options.
+CONF_MAX_BLOCK_SIZE = "max_block_size"
+CONF_MAX_GAP = "max_gap"
+DEFAULT_MAX_BLOCK_SIZE = 60
+DEFAULT_MAX_GAP = 8
+
+# Poll tiers that register map entries can select with "poll". Entries
+# without a tier use the entry's scan interval; "static" entries are read
+# once and then only after a failed read.
+POLL_TIER_FAST = "fast"
+POLL_TIER_NORMAL = "normal"
+POLL_TIER_SLOW = "slow"
+POLL_TIER_STATIC = "static"
+POLL_TIERS = {
+    POLL_TIER_FAST: 5,
+    POLL_TIER_SLOW: 300,
+}
+
+# Consecutive failed polls before the coordinator looks for its charger at
+# a new address, and the minimum time between two such searches (seconds)
+REDISCOVER_AFTER_FAILURES = 5
+REDISCOVER_COOLDOWN = 600
+
+# Fleet scheduler: Modbus transactions allowed in flight across all chargers
+# at once, and the window (seconds) its throughput and latency cover
+FLEET_MAX_INFLIGHT = 8
+FLEET_STATS_WINDOW = 60
+
+# Adaptive polling: live (fast and normal tier) blocks are polled at the
+# minimum interval while a car is connected, and back off towards the
+# maximum while the charger is idle and its values are not changing.
+CONF_ADAPTIVE = "adaptive"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_MAX_INTERVAL = "max_interval"
+DEFAULT_MIN_INTERVAL = 5
+DEFAULT_MAX_INTERVAL = 60
+ADAPTIVE_BACKOFF = 1.5
+ADAPTIVE_IDLE_STATES = ("Unknown", "idle", "System upgrade", "Power-on status")
+
+# Register map roles the integration looks entries up by
+ROLE_CHARGING_STATE = "charging_state"
+ROLE_CHARGE_LIMIT = "charge_limit"
+ROLE_METER_ENERGY = "meter_energy"
+ROLE_ACTIVE_POWER = "active_power"
+
+# Solar diversion: a PI controller that sets the charge limit (A) from a
+# grid export power sensor (W, positive when exporting), leaving a target
+# export. Writes need a change of at least the hysteresis (A) and are at
+# least the minimum dwell (seconds) apart.
+CONF_DIVERSION_SOURCE = "diversion_source"
+CONF_DIVERSION_TARGET = "diversion_target"
+CONF_DIVERSION_PHASES = "diversion_phases"
+CONF_DIVERSION_KP = "diversion_kp"
+CONF_DIVERSION_KI = "diversion_ki"
+CONF_DIVERSION_HYSTERESIS = "diversion_hysteresis"
+CONF_DIVERSION_MIN_DWELL = "diversion_min_dwell"
+DEFAULT_DIVERSION_TARGET = 0
+DEFAULT_DIVERSION_PHASES = 1
+DEFAULT_DIVERSION_KP = 0.5
+DEFAULT_DIVERSION_KI = 0.05
+DEFAULT_DIVERSION_HYSTERESIS = 1.0
+DEFAULT_DIVERSION_MIN_DWELL = 30
+DIVERSION_VOLTAGE = 230
+# Longest gap (seconds) between source updates the integrator accounts for
+DIVERSION_MAX_STEP = 30
+DIVERSION_CHARGING_STATES = ("charging",)
+
+# Per-block read retries: attempts after the first, jittered exponential
+# backoff bounds (seconds), and the time budget for all reads in one poll
+BLOCK_RETRIES = 2
+RETRY_BACKOFF_BASE = 0.2
+RETRY_BACKOFF_MAX = 2.0
+POLL_TIMEOUT_BUDGET = 10.0
+
+# Rolling window (seconds) for poll metrics, and the samples kept per series
+METRICS_WINDOW = 900
+METRICS_MAX_SAMPLES = 4096
+# Polls kept in full for the diagnostics download
+METRICS_HISTORY = 100
+
+# Snapshots kept per charger by the register history ring buffer (about
+# two and a half days at the 5 s fast tier) and where exports are written,
+# under the config directory
+HISTORY_CAPACITY = 43200
+HISTORY_EXPORT_DIR = "givevc_history"
+
+# Warm start: each entry's last good register image is saved to storage at
+# most this often (seconds) while it changes, and when the entry unloads
+IMAGE_STORAGE_VERSION = 1
+IMAGE_SAVE_INTERVAL = 300
+
+# Session accounting: a session runs while the charging state is not one of
+# ADAPTIVE_IDLE_STATES. Energy comes from meter deltas and is costed at the
+# tariff (per kWh) in force when it was used, either a fixed price or a
+# price sensor. Finished sessions are kept in a log of this many entries.
+CONF_TARIFF = "tariff"
+CONF_TARIFF_ENTITY = "tariff_entity"
+DEFAULT_TARIFF = 0.0
+SESSION_STORAGE_VERSION = 1
+SESSION_LOG_SIZE = 100
+SESSION_SAVE_DELAY = 60
+# Highest charging power (kW) a meter step may imply since the previous
+# reading; larger steps are taken as a meter reset or a bad read
+SESSION_MAX_POWER_KW = 23
+SIGNAL_SESSION = "givevc_session_{}"
+
+# Platforms every entry sets up for its health and metric entities; the
+# rest are only set up when the register map has entities for them
+HEALTH_PLATFORMS = ("sensor", "binary_sensor")
+
+# Dispatcher signal carrying an entry's health after every poll
+SIGNAL_HEALTH = "givevc_health_{}"
+
+# Services
+SERVICE_RELOAD_REGISTER_MAP = "reload_register_map"
+SERVICE_EXPORT_HISTORY = "export_history"
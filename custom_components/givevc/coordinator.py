@@ -1,60 +1,717 @@
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from pymodbus.client import ModbusTcpClient,AsyncModbusTcpClient
+import homeassistant.util.dt as dt_util
+import asyncio
 import logging
+import random
+import time
+from array import array
 from datetime import datetime, timedelta, timezone
 
+from .connection import ModbusConnection
+from .const import (
+    ADAPTIVE_BACKOFF,
+    ADAPTIVE_IDLE_STATES,
+    BLOCK_RETRIES,
+    DEFAULT_MAX_BLOCK_SIZE,
+    DEFAULT_MAX_GAP,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
+    DOMAIN,
+    IMAGE_SAVE_INTERVAL,
+    IMAGE_STORAGE_VERSION,
+    POLL_TIMEOUT_BUDGET,
+    REDISCOVER_AFTER_FAILURES,
+    REDISCOVER_COOLDOWN,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+    ROLE_ACTIVE_POWER,
+    ROLE_CHARGING_STATE,
+    ROLE_METER_ENERGY,
+    SIGNAL_HEALTH,
+    SIGNAL_SESSION,
+)
+from .decoder import DecodePlan
+from .discovery import async_get_discovery_cache
+from .history import RegisterHistory
+from .metrics import PollMetrics
+from .planner import entry_addresses, entry_interval, plan_tiers
+from .register_map import ENTRY_PLATFORMS
+from .sessions import SessionTracker
+from .storage import ThrottledStore
+from .write_queue import WriteQueue
+
 
 _LOGGER = logging.getLogger(__name__)
 
 
 class ModbusCoordinator(DataUpdateCoordinator):
-    def __init__(self, hass, host, port, unit_id, scan_interval, register_count):
+    def __init__(
+        self,
+        hass,
+        host,
+        port,
+        unit_id,
+        scan_interval,
+        register_map,
+        max_block_size=DEFAULT_MAX_BLOCK_SIZE,
+        max_gap=DEFAULT_MAX_GAP,
+        entry=None,
+        fleet=None,
+        adaptive=False,
+        min_interval=DEFAULT_MIN_INTERVAL,
+        max_interval=DEFAULT_MAX_INTERVAL,
+    ):
+        self.entry = entry
+        self.serial = entry.data.get("serial") if entry is not None else None
+        # Options the entry was set up with; a change to them needs a reload
+        self.options = dict(entry.options) if entry is not None else {}
+        self.port = port
         self.unit_id = unit_id
-        self.register_count = register_count
         self.last_success = True
         self.last_success_time = None
+        self.last_error = None
         self.failure_count = 0
         self.total_retries = 0
         self.host=host
+        self.fleet = fleet
+        self.metrics = PollMetrics()
+        self.connection = ModbusConnection(
+            host,
+            port,
+            transact=fleet.async_transact if fleet is not None else None,
+            metrics=self.metrics,
+        )
+        # Held for a whole poll or write batch so the two never interleave
+        self.io_lock = asyncio.Lock()
+        self.write_queue = WriteQueue(self)
+        # Decoded entity values keyed by register map entry name, and the
+        # names whose value changed in the last refresh (None means all)
+        self.values = {}
+        self._changed = None
+        # Values shown by entities with a write in flight, until read back
+        self._optimistic = {}
+        # Each platform's async_add_entities and entity factory, and the
+        # entities created so far keyed by entry name
+        self._platforms = {}
+        self.entities = {}
+        # Platforms forwarded for this entry, and how long setup took
+        self.loaded_platforms = set()
+        self.setup_profile = None
+
+        # Ensure scan_interval is in seconds
+        if isinstance(scan_interval, timedelta):
+            scan_interval = scan_interval.total_seconds()
+        self.scan_interval = scan_interval
+        self.max_block_size = max_block_size
+        self.max_gap = max_gap
+
+        # Adaptive mode rescales the live tiers (those polled at least as
+        # often as the scan interval) from the charging state and from how
+        # much the live values are changing.
+        self.adaptive = adaptive
+        self.min_interval = float(min_interval)
+        self.max_interval = float(max(min_interval, max_interval))
+        self.adaptive_interval = self.min_interval
+        self.charging_active = None
+        # The solar diversion controller, when the entry has a source set
+        self.diversion = None
+        # Charging session accounting; loaded from storage at setup
+        self.sessions = SessionTracker(hass, entry.entry_id, self.options) if entry is not None else None
 
-        # Ensure update_interval is a timedelta
-        update_interval_td = (
-            timedelta(seconds=scan_interval)
-            if isinstance(scan_interval, (int, float))
-            else scan_interval
+        self.blocks = []
+        # The register image, preallocated and updated in place. The
+        # generation goes up whenever any register changes, and ``dirty``
+        # has bit i set when block i changed in the last update, so
+        # unchanged polls skip decoding altogether.
+        self._image = array("H")
+        self.generation = 0
+        self.dirty = 0
+        self._decoded_generation = None
+        self.history = None
+        self._next_read = {}
+        # Blocks read at least once, and blocks whose last read failed with
+        # the time they first failed; their last good values are kept
+        self._read_blocks = set()
+        self.stale_blocks = {}
+        self._stale_changed = set()
+        self._apply_register_map(register_map)
+        # The last good image is kept in storage so a restart can show it
+        # straight away while the first poll runs
+        self._image_store = (
+            ThrottledStore(hass, IMAGE_STORAGE_VERSION, f"{DOMAIN}.image.{entry.entry_id}")
+            if entry is not None else None
         )
+        self.restored_at = None
+
+        # The coordinator ticks at the fastest tier; each refresh only reads
+        # the blocks that are due. Within a fleet the scheduler does the
+        # ticking, so the coordinator runs no timer of its own.
+        self.poll_interval = self._fastest_interval()
 
         super().__init__(
             hass,
             _LOGGER,
             name="Modbus Coordinator",
-            update_interval=update_interval_td,
+            update_interval=self.poll_interval if fleet is None else None,
         )
 
         self.last_success = True  # Track connection status
+        self._rediscover_task = None
+        self._last_rediscover = None
 
     async def _async_update_data(self):
+        poll_started = time.perf_counter()
+        blocks_read = 0
         try:
-
-            async with AsyncModbusTcpClient(host=self.host, port=502) as client:
-                if not client.connected:
-                    raise UpdateFailed("Modbus client failed to connect")
-                result  = await client.read_holding_registers(0, count=60)
-                result2 = await client.read_holding_registers(60, count=55)
-            if result.isError() or result2.isError():
-                self.last_success = False
-                self.failure_count += 1
-                self.total_retries += 1
-                raise UpdateFailed("Modbus read failed")
+            # Registers are stored by absolute address and merged in place, so
+            # blocks that are not due keep their last values. Anything the map
+            # does not reference is left as zero. Blocks due before the next
+            # tick's midpoint are read now, so they line up with the ticks
+            # (and the fleet's phases) rather than slipping by an interval.
+            now = time.monotonic() + self.poll_interval.total_seconds() / 2
+            deadline = time.monotonic() + POLL_TIMEOUT_BUDGET
+            failed = []
+            read_mask = 0
+            self.dirty = 0
+            async with self.io_lock:
+                for index, block in enumerate(self.blocks):
+                    if self._next_read[block] > now:
+                        continue
+                    start, count, interval = block
+                    try:
+                        registers = await self._async_read_block(start, count, deadline)
+                    except Exception as err:
+                        # Keep the block's last good values and try it again
+                        # on the next tick rather than a whole interval later
+                        failed.append(f"{start}+{count}: {err}")
+                        self._set_stale(block, True)
+                        continue
+                    blocks_read += 1
+                    read_mask |= 1 << index
+                    self._store_block(index, block, registers)
+                    self._set_stale(block, False)
+                    interval = self._block_interval(interval)
+                    self._next_read[block] = (
+                        float("inf") if interval is None else time.monotonic() + interval
+                    )
+            if failed and not blocks_read:
+                raise UpdateFailed("; ".join(failed))
+            if failed:
+                _LOGGER.debug("Partial poll of %s; keeping last values for %s", self.host, failed)
+            if read_mask & self._history_mask:
+                self.history.append(time.time(), self._image)
+            if self.dirty:
+                self._async_schedule_image_save()
+            self._set_values(self._decode())
+            self.metrics.record_poll(
+                True, time.perf_counter() - poll_started, blocks_read, "; ".join(failed) or None
+            )
+            if self.adaptive:
+                self._adapt_interval()
+            if self.sessions is not None:
+                self._async_update_session()
             self.last_success = True
             self.last_success_time = datetime.now(timezone.utc)
+            self.last_error = None
             self.failure_count = 0
-            allregisters=result.registers + result2.registers
+            self._async_publish_health()
+            if self.serial:
+                (await async_get_discovery_cache(self.hass)).seen(self.serial, self.host)
             #_LOGGER.warning("Data collected successfully")
-            return allregisters
+            return self._image
         except Exception as e:
+            self._changed = None
             self.last_success = False
             self.failure_count += 1
             self.total_retries += 1
+            self.last_error = str(e)
+            self.metrics.record_poll(False, time.perf_counter() - poll_started, blocks_read, self.last_error)
+            self._async_publish_health()
+            if self.failure_count >= REDISCOVER_AFTER_FAILURES:
+                self._async_start_rediscovery()
             raise UpdateFailed(f"Modbus read exception - {e}")
 
+    async def _async_read_block(self, start, count, deadline):
+        """Read one block, retrying with jittered exponential backoff.
+
+        Each attempt's timeout is cut to what is left before ``deadline``,
+        the poll's time budget, and no retry starts that could not finish
+        within it. Returns the registers or raises the last error.
+        """
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("poll time budget exhausted")
+                result = await self.connection.read_holding_registers(start, count=count, timeout=remaining)
+                if result.isError():
+                    raise UpdateFailed(f"Modbus read of {count} registers at {start} failed")
+                if len(result.registers) < count:
+                    raise UpdateFailed(
+                        f"Modbus read at {start} returned {len(result.registers)} of {count} registers"
+                    )
+            except Exception:
+                self.metrics.read_errors += 1
+                delay = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** attempt)
+                # A dropped socket cannot be reopened before the connection's
+                # own reconnect backoff allows it
+                delay = max(delay * random.uniform(0.5, 1.5), self.connection.retry_after)
+                attempt += 1
+                if attempt > BLOCK_RETRIES or time.monotonic() + delay >= deadline:
+                    raise
+                self.metrics.retries += 1
+                await asyncio.sleep(delay)
+                continue
+            self.metrics.record_read(start, count, time.perf_counter() - started)
+            return result.registers[:count]
+
+    def _store_block(self, index, block, registers):
+        start, count, _ = block
+        registers = array("H", registers)
+        if block in self._read_blocks and self._image[start:start + count] == registers:
+            return
+        self._image[start:start + count] = registers
+        self._read_blocks.add(block)
+        self.dirty |= 1 << index
+        self.generation += 1
+
+    def registers(self, start, count):
+        """A zero-copy view of ``count`` registers of the image from ``start``."""
+        return memoryview(self._image)[start:start + count]
+
+    def _set_stale(self, block, stale):
+        if stale == (block in self.stale_blocks):
+            return
+        if stale:
+            self.stale_blocks[block] = datetime.now(timezone.utc)
+        else:
+            del self.stale_blocks[block]
+        self._stale_changed |= self._block_names.get(block, set())
+
+    def _image_data(self):
+        # Each block is saved with the time its values were last good: now,
+        # or when it went stale, which for a block restored and not yet
+        # read again is the time carried over from the previous save
+        now = datetime.now(timezone.utc)
+        return {
+            "saved": now.isoformat(),
+            "generation": self.generation,
+            "register_map_version": self.register_map.digest,
+            "blocks": [
+                [
+                    block[0],
+                    self._image[block[0]:block[0] + block[1]].tolist(),
+                    self.stale_blocks.get(block, now).isoformat(),
+                ]
+                for block in sorted(self._read_blocks)
+            ],
+        }
+
+    @callback
+    def _async_schedule_image_save(self):
+        if self._image_store is not None:
+            self._image_store.async_throttled_save(self._image_data, IMAGE_SAVE_INTERVAL)
+
+    async def async_restore_image(self):
+        """Load the last saved image, with every restored block stale.
+
+        Only blocks of the current plan whose registers were all saved are
+        restored, stale since the oldest last-good time saved for any of
+        their registers. Returns True if any were, so setup need not wait
+        for the first poll.
+        """
+        if self._image_store is None:
+            return False
+        data = await self._image_store.async_load()
+        if not data:
+            return False
+        saved_at = datetime.fromisoformat(data["saved"])
+        saved = {}
+        good = {}
+        for start, registers, *since in data.get("blocks", []):
+            since = datetime.fromisoformat(since[0]) if since else saved_at
+            for address, register in zip(range(start, start + len(registers)), registers):
+                saved[address] = register
+                good[address] = since
+        for block in self.blocks:
+            start, count, _ = block
+            addresses = range(start, start + count)
+            if any(address not in saved for address in addresses):
+                continue
+            self._image[start:start + count] = array("H", (saved[address] for address in addresses))
+            self._read_blocks.add(block)
+            self.stale_blocks[block] = min(good[address] for address in addresses)
+        if not self._read_blocks:
+            return False
+        self.generation = data.get("generation", 0) + 1
+        self._set_values(self._decode())
+        self.restored_at = saved_at
+        _LOGGER.debug(
+            "Restored %d of %d blocks for %s saved at %s",
+            len(self._read_blocks), len(self.blocks), self.host, data["saved"],
+        )
+        return True
+
+    def stale_since(self, name):
+        """When the oldest stale block behind an entry first failed, or None."""
+        since = [
+            self.stale_blocks[block]
+            for block in self._name_blocks.get(name, ())
+            if block in self.stale_blocks
+        ]
+        return min(since, default=None)
+
+    def _apply_register_map(self, register_map):
+        """Rebuild the read plan and decoders for a register map.
+
+        Registers already read are kept, as are the due times of blocks the
+        new plan shares with the old one; new blocks are due straight away.
+        """
+        self.register_map = register_map
+        self.decode_plan = DecodePlan(register_map)
+        self.roles = {
+            config["role"]: config["name"] for config in register_map if config.get("role")
+        }
+        self._live_names = {
+            config["name"] for config in register_map
+            if config.get("type") != "timestamp"
+            and (entry_interval(config, self.scan_interval) or float("inf")) <= self.scan_interval
+        }
+        self.blocks = plan_tiers(register_map, self.scan_interval, self.max_block_size, self.max_gap)
+        self.image_size = max((start + count for start, count, _ in self.blocks), default=0)
+        image = array("H", bytes(2 * self.image_size))
+        kept = min(len(self._image), self.image_size)
+        image[:kept] = self._image[:kept]
+        self._image = image
+        self._decoded_generation = None
+        # Keep the recorded history unless the map changed what it records
+        history = RegisterHistory(register_map)
+        if self.history is None or self.history.layout != history.layout:
+            self.history = history
+        history_addresses = self.history.addresses
+        self._history_mask = 0
+        for index, (start, count, _) in enumerate(self.blocks):
+            if any(start <= address < start + count for address in history_addresses):
+                self._history_mask |= 1 << index
+        self._next_read = {block: self._next_read.get(block, 0.0) for block in self.blocks}
+        self._read_blocks &= set(self.blocks)
+        self.stale_blocks = {
+            block: since for block, since in self.stale_blocks.items() if block in self._next_read
+        }
+        # Which blocks each entry is read from, and the reverse
+        self._name_blocks = {}
+        self._block_names = {block: set() for block in self.blocks}
+        for config in register_map:
+            addresses = config.get("addresses") or entry_addresses(config)
+            blocks = [
+                block for block in self.blocks
+                if any(block[0] <= address < block[0] + block[1] for address in addresses)
+            ]
+            self._name_blocks[config["name"]] = blocks
+            for block in blocks:
+                self._block_names[block].add(config["name"])
+        _LOGGER.debug("Read plan for %s: %s", self.host, self.blocks)
+
+    async def async_reload_register_map(self, register_map):
+        """Switch to a new register map without reconnecting.
+
+        Only entities whose entry was added, removed or changed are touched.
+        Returns the ``(added, removed, changed)`` entry names.
+        """
+        old = self.register_map
+        added = [name for name in register_map.by_name if name not in old.by_name]
+        removed = [name for name in old.by_name if name not in register_map.by_name]
+        changed = [
+            name for name, config in register_map.by_name.items()
+            if name in old.by_name and config != old.by_name[name]
+        ]
+        async with self.io_lock:
+            self._apply_register_map(register_map)
+            self.poll_interval = self._fastest_interval()
+            if self.fleet is None:
+                self.update_interval = self.poll_interval
+        # Read any new blocks before the new entities first report a value
+        await self.async_refresh()
+
+        registry = er.async_get(self.hass)
+        for name in removed + changed:
+            entity = self.entities.pop(name, None)
+            if entity is None:
+                continue
+            await entity.async_remove(force_remove=True)
+            if name in removed and registry.async_get(entity.entity_id) is not None:
+                registry.async_remove(entity.entity_id)
+        for platform in self._platforms:
+            self._async_add_entities(
+                platform,
+                [config for config in register_map.platform(platform) if config["name"] in added + changed],
+            )
+        # Platforms the old map had no entities for set up the new ones
+        # themselves from the map now in place
+        missing = {
+            ENTRY_PLATFORMS[register_map.by_name[name]["type"]] for name in added + changed
+        } - self.loaded_platforms
+        if missing:
+            await self.hass.config_entries.async_late_forward_entry_setups(self.entry, sorted(missing))
+            self.loaded_platforms |= missing
+        return added, removed, changed
+
+    @callback
+    def async_register_platform(self, platform, async_add_entities, factory):
+        """Create a platform's entities and keep what is needed to add more.
+
+        ``factory`` builds one entity from a register map entry.
+        """
+        self._platforms[platform] = (async_add_entities, factory)
+        self._async_add_entities(platform, self.register_map.platform(platform))
+
+    @callback
+    def _async_add_entities(self, platform, configs):
+        if not configs:
+            return
+        async_add_entities, factory = self._platforms[platform]
+        entities = []
+        for config in configs:
+            entity = factory(config)
+            self.entities[config["name"]] = entity
+            entities.append(entity)
+        async_add_entities(entities)
+
+    def _block_interval(self, interval):
+        """Return the effective polling interval of a block's tier."""
+        if not self.adaptive or interval is None or interval > self.scan_interval:
+            return interval
+        scaled = interval * self.adaptive_interval / self.scan_interval
+        return min(max(scaled, self.min_interval), self.max_interval)
+
+    def _fastest_interval(self):
+        intervals = [
+            self._block_interval(interval) for _, _, interval in self.blocks if interval is not None
+        ]
+        return timedelta(seconds=min(intervals, default=self.scan_interval))
+
+    def _adapt_interval(self):
+        """Pick the live polling interval after a successful refresh.
+
+        While a car is connected the live tiers run at the minimum interval.
+        Otherwise they back off towards the maximum while nothing live
+        changes, and step back towards the minimum when something does.
+        """
+        state = self.values.get(self.roles.get(ROLE_CHARGING_STATE))
+        active = state is not None and state not in ADAPTIVE_IDLE_STATES
+        changed = self._changed is None or not self._changed.isdisjoint(self._live_names)
+        connected = active and self.charging_active is False
+        self.charging_active = active
+
+        if active:
+            interval = self.min_interval
+        elif changed:
+            interval = max(self.min_interval, self.adaptive_interval / ADAPTIVE_BACKOFF)
+        else:
+            interval = min(self.max_interval, self.adaptive_interval * ADAPTIVE_BACKOFF)
+        if interval == self.adaptive_interval and not connected:
+            return
+        if interval != self.adaptive_interval:
+            _LOGGER.debug(
+                "Adaptive poll interval for %s: %.1fs (charging state %s)", self.host, interval, state
+            )
+        self.adaptive_interval = interval
+        self.poll_interval = self._fastest_interval()
+        if self.fleet is None:
+            self.update_interval = self.poll_interval
+
+        if connected:
+            # A car has just connected: bring the live blocks forward so
+            # power and current are read on the very next tick.
+            now = time.monotonic()
+            for block in self.blocks:
+                if block[2] is not None and block[2] <= self.scan_interval:
+                    self._next_read[block] = min(self._next_read[block], now)
+            if self.fleet is not None:
+                self.fleet.async_reschedule(self, self.min_interval)
+
+    @callback
+    def _async_update_session(self):
+        values = self.values
+        if self.sessions.async_update(
+            values.get(self.roles.get(ROLE_CHARGING_STATE)),
+            values.get(self.roles.get(ROLE_METER_ENERGY)),
+            values.get(self.roles.get(ROLE_ACTIVE_POWER)),
+            time.time(),
+        ):
+            async_dispatcher_send(self.hass, SIGNAL_SESSION.format(self.entry.entry_id))
+
+    def health(self):
+        """Connectivity and poll health, as sent to the health entities."""
+        return {
+            "connected": self.last_success,
+            "consecutive_failures": self.failure_count,
+            "success_rate": self.metrics.success_rate(),
+            "latency_mean_ms": self.metrics.poll.mean(),
+            "latency_p95_ms": self.metrics.poll.percentile(0.95),
+            "last_success_time": self.last_success_time,
+            "last_error": self.last_error,
+            "stale_blocks": len(self.stale_blocks),
+        }
+
+    @callback
+    def _async_publish_health(self):
+        if self.entry is not None:
+            async_dispatcher_send(self.hass, SIGNAL_HEALTH.format(self.entry.entry_id), self.health())
+
+    @callback
+    def _async_start_rediscovery(self):
+        """Look for the charger at a new address in the background."""
+        if not self.serial or self.entry is None:
+            return
+        if self._rediscover_task is not None and not self._rediscover_task.done():
+            return
+        now = time.monotonic()
+        if self._last_rediscover is not None and now - self._last_rediscover < REDISCOVER_COOLDOWN:
+            return
+        self._last_rediscover = now
+        self._rediscover_task = self.hass.async_create_background_task(
+            self._async_rediscover(), f"givevc rediscover {self.serial}"
+        )
+
+    async def _async_rediscover(self):
+        _LOGGER.info("GivEVC %s not answering at %s; searching for it", self.serial, self.host)
+        cache = await async_get_discovery_cache(self.hass)
+        host = await cache.async_resolve(self.serial, self.host, self.port)
+        if host is None or host == self.host:
+            _LOGGER.warning("GivEVC %s was not found at a new address", self.serial)
+            return
+        _LOGGER.warning("GivEVC %s moved from %s to %s", self.serial, self.host, host)
+        self.host = host
+        await self.connection.async_set_host(host)
+        self.hass.config_entries.async_update_entry(
+            self.entry, data={**self.entry.data, "host": host}
+        )
+        await self.async_request_refresh()
+
+    async def async_write_registers(self, address, values):
+        """Write registers through the entry's write queue.
+
+        Returns the registers read back after the write; the register image
+        and affected entities are updated without a full refresh.
+        """
+        return await self.write_queue.async_write(address, values)
+
+    async def async_write_entity(self, name, address, values, value):
+        """Write an entity's registers, showing ``value`` straight away.
+
+        The entity reports ``value`` until the write's read-back, which
+        confirms it or shows what the charger actually holds. If the write
+        fails the previous value comes back and HomeAssistantError is raised
+        so the failure reaches the caller.
+        """
+        # A fresh list per write, so an earlier write finishing does not
+        # clear the value of a later one to the same entity
+        pending = self._optimistic[name] = [value]
+        self._async_notify(name)
+        try:
+            return await self.async_write_registers(address, values)
+        except Exception as err:
+            raise HomeAssistantError(f"Writing {name} to {self.host} failed: {err}") from err
+        finally:
+            if self._optimistic.get(name) is pending:
+                del self._optimistic[name]
+                self._async_notify(name)
+
+    def value(self, name):
+        """An entity's value, or the value of its write in flight."""
+        pending = self._optimistic.get(name)
+        return pending[0] if pending is not None else self.values.get(name)
+
+    @callback
+    def _async_notify(self, name):
+        for update_callback, context in list(self._listeners.values()):
+            if context == name:
+                update_callback()
+
+    @callback
+    def async_apply_registers(self, registers):
+        """Merge ``{address: value}`` registers into the image and dispatch."""
+        changed = [
+            address for address, value in registers.items()
+            if address < self.image_size and self._image[address] != value
+        ]
+        self.dirty = 0
+        if changed:
+            for address in changed:
+                self._image[address] = registers[address]
+            for index, (start, count, _) in enumerate(self.blocks):
+                if any(start <= address < start + count for address in changed):
+                    self.dirty |= 1 << index
+            self.generation += 1
+        self._set_values(self._decode())
+        self.async_update_listeners()
+
+    def _decode(self):
+        """Decode the image, unless it has not changed since the last time.
+
+        Timestamp entries are built on today's date, so a new local day
+        decodes again even when no register changed.
+        """
+        decoded = (self.generation, dt_util.now().date())
+        if self._decoded_generation == decoded:
+            return self.values
+        started = time.perf_counter()
+        values = self.decode_plan.decode(self._image)
+        # Registers that have never been read are not zero, just unknown
+        for block in self.blocks:
+            if block not in self._read_blocks:
+                for name in self._block_names[block]:
+                    values[name] = None
+        self.metrics.decode.add(time.perf_counter() - started)
+        self._decoded_generation = decoded
+        return values
+
+    def _set_values(self, values):
+        previous = self.values
+        # Entities must all be told when availability flips back
+        if self.last_update_success and previous:
+            self._changed = {
+                key for key, value in values.items()
+                if key not in previous or previous[key] != value
+            }
+        else:
+            self._changed = None
+        # Entities whose blocks went stale or recovered show it in their
+        # attributes, even when their value did not change
+        if self._changed is not None:
+            self._changed |= self._stale_changed
+        self._stale_changed = set()
+        self.values = values
+
+    @callback
+    def async_update_listeners(self):
+        """Notify only the entities whose value changed in the last refresh.
+
+        Entities register with their entry name as context; listeners without
+        a context are always called.
+        """
+        changed, self._changed = self._changed, None
+        started = time.perf_counter()
+        for update_callback, context in list(self._listeners.values()):
+            if changed is None or context is None or context in changed:
+                update_callback()
+        self.metrics.dispatch.add(time.perf_counter() - started)
+
+    async def async_shutdown(self):
+        """Stop polling and close the shared Modbus connection."""
+        await super().async_shutdown()
+        if self._rediscover_task is not None:
+            self._rediscover_task.cancel()
+        self.write_queue.cancel()
+        if self._image_store is not None and self._read_blocks:
+            await self._image_store.async_save(self._image_data())
+        if self.sessions is not None:
+            await self.sessions.async_save()
+        await self.connection.close()
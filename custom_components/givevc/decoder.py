@@ -0,0 +1,139 @@
+import logging
+from datetime import datetime
+
+import homeassistant.util.dt as dt_util
+
+from .helpers import compile_specs, decode_batch
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def value_type(config):
+    """Return the helpers.decode_batch type for a register map entry.
+
+    Floats are IEEE 754, other entries with a byte order span two registers
+    and everything else is a single register; ``signed`` selects the signed
+    integer variants. Two-register number entries are signed unless set
+    otherwise, as a negative setting must read back as it was written.
+    """
+    signed = config.get("signed", config.get("type") == "number" and bool(config.get("byte_order")))
+    if config.get("float"):
+        return "float32"
+    if config.get("byte_order"):
+        return "s32" if signed else "u32"
+    return "s16" if signed else "u16"
+
+
+def _finish_sensor(config):
+    scale = config.get("scale", 1.0)
+    lookup = config.get("lookup")
+
+    if lookup:
+        def finish(val):
+            # Map the raw (unscaled) value to a state if the lookup covers it
+            mapped = lookup.get(int(val))
+            if mapped is not None:
+                return mapped
+            return round(val * scale, 2)
+        return finish
+    return lambda val: round(val * scale, 2)
+
+
+def _finish_number(config):
+    scale = config.get("scale", 1.0)
+    return lambda val: round(val * scale, 2)
+
+
+def _finish_select(config):
+    return (config.get("lookup") or {}).get
+
+
+def _finish_switch(config):
+    # The switch is on when the register holds the value turning it on
+    # writes: write_on, or write_off when inverted. Other values read as
+    # truthy or not.
+    write_on, write_off = config.get("write_on", 1), config.get("write_off", 0)
+    invert = config.get("invert", False)
+
+    def finish(val):
+        state = True if val == write_on else False if val == write_off else bool(val)
+        return state != invert
+    return finish
+
+
+_FINISHERS = {
+    "sensor": _finish_sensor,
+    "number": _finish_number,
+    "select": _finish_select,
+    "switch": _finish_switch,
+}
+
+
+class DecodePlan:
+    """Decoders for every register map entry, compiled once at setup.
+
+    Takes a compiled ``register_map.RegisterMap`` (lookups keyed by int).
+
+    All registers are decoded from the image with a single
+    ``helpers.decode_batch`` call, then scale and lookups are applied to give
+    a table of entity values keyed by entry name.
+    """
+
+    def __init__(self, register_map):
+        specs = []
+        self._entries = []
+        self._timestamps = []
+        for config in register_map:
+            entry_type = config.get("type")
+            try:
+                if entry_type == "timestamp":
+                    indexes = []
+                    for key in ("register", "register_minute", "register_second"):
+                        if config.get(key) is None:
+                            indexes.append(None)
+                            continue
+                        specs.append((config[key], "u16", None, 1))
+                        indexes.append(len(specs) - 1)
+                    self._timestamps.append((config["name"], indexes))
+                elif entry_type in _FINISHERS:
+                    finish = _FINISHERS[entry_type](config)
+                    register_type = value_type(config) if entry_type in ("sensor", "number") else "u16"
+                    specs.append((config["register"], register_type, config.get("byte_order"), 1))
+                    self._entries.append((config["name"], finish, len(specs) - 1))
+            except (KeyError, TypeError, ValueError) as err:
+                _LOGGER.warning("Cannot decode register map entry '%s': %s", config.get("name"), err)
+        self._specs = []
+        for spec in specs:
+            try:
+                self._specs += compile_specs([spec])
+            except ValueError as err:
+                _LOGGER.warning("Cannot decode register %s: %s; using ABCD", spec[0], err)
+                self._specs += compile_specs([(spec[0], spec[1], "ABCD", spec[3])])
+
+    def decode(self, data):
+        raw = decode_batch(data, self._specs)
+        values = {}
+        for key, finish, index in self._entries:
+            val = raw[index]
+            try:
+                values[key] = None if val is None else finish(val)
+            except (TypeError, ValueError, OverflowError):
+                values[key] = None
+        if self._timestamps:
+            tz = dt_util.DEFAULT_TIME_ZONE
+            now_local = dt_util.now().astimezone(tz)
+            today = datetime(now_local.year, now_local.month, now_local.day, tzinfo=tz)
+            for key, indexes in self._timestamps:
+                # Missing minute/second registers count as zero
+                parts = [0 if index is None else raw[index] for index in indexes]
+                values[key] = _timestamp(today, *parts)
+        return values
+
+
+def _timestamp(today, hour, minute, second):
+    """Build today's datetime from hour, minute and second register values."""
+    if hour is None or minute is None or second is None:
+        return None
+    if not (0 <= hour <= 23 and 0 <= minute <= 59 and 0 <= second <= 59):
+        return None
+    return today.replace(hour=hour, minute=minute, second=second)
@@ -1,41 +1,64 @@
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.diagnostics import REDACTED, async_redact_data
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from .const import DOMAIN
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
-    coordinator = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([
-        ModbusRetrySensor(coordinator),
-        ModbusLastSuccessSensor(coordinator)
-    ])
-
-class ModbusRetrySensor(SensorEntity):
-    def __init__(self, coordinator):
-        self.coordinator = coordinator
-        self._attr_name = "Modbus Retry Count"
-        self._attr_icon = "mdi:reload"
+# Identify the charger and the network it is on
+TO_REDACT = {"host", "serial"}
 
-    @property
-    def unique_id(self):
-        return f"modbus_retry_{self.coordinator.client.host}"
 
-    @property
-    def state(self):
-        return self.coordinator.failure_count
+def _redact_host(data, host):
+    """Mask the charger's address wherever it appears in error text."""
+    if isinstance(data, dict):
+        return {key: _redact_host(value, host) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_redact_host(value, host) for value in data]
+    if isinstance(data, str) and host:
+        return data.replace(host, REDACTED)
+    return data
 
-class ModbusLastSuccessSensor(SensorEntity):
-    def __init__(self, coordinator):
-        self.coordinator = coordinator
-        self._attr_name = "Modbus Last Success"
-        self._attr_icon = "mdi:clock-check"
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry):
+    """Return diagnostics for a config entry.
 
-    @property
-    def unique_id(self):
-        return f"modbus_last_success_{self.coordinator.client.host}"
-
-    @property
-    def state(self):
-        if self.coordinator.last_success_time:
-            return self.coordinator.last_success_time.isoformat()
-        return "never"
\ No newline at end of file
+    Includes the last raw register image (only the planned blocks), the
+    read plan, health, poll timing history and fleet-wide polling stats.
+    """
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    health = coordinator.health()
+    if health["last_success_time"] is not None:
+        health["last_success_time"] = health["last_success_time"].isoformat()
+    # Connection errors raised below the integration may still name the host
+    health = _redact_host(health, coordinator.host)
+    metrics = _redact_host(coordinator.metrics.as_dict(), coordinator.host)
+    return async_redact_data({
+        "host": coordinator.host,
+        "serial": coordinator.serial,
+        "options": dict(entry.options),
+        "register_map_version": coordinator.register_map.digest,
+        "setup_profile": coordinator.setup_profile,
+        "poll_interval": coordinator.poll_interval.total_seconds(),
+        "adaptive_interval": coordinator.adaptive_interval if coordinator.adaptive else None,
+        "blocks": coordinator.blocks,
+        "registers": {
+            f"{start}+{count}": coordinator.registers(start, count).tolist()
+            for start, count, _ in coordinator.blocks
+        },
+        "generation": coordinator.generation,
+        "restored_at": coordinator.restored_at.isoformat() if coordinator.restored_at else None,
+        "values": {key: str(value) for key, value in coordinator.values.items()},
+        "stale_blocks": {
+            f"{start}+{count}": since.isoformat()
+            for (start, count, _), since in coordinator.stale_blocks.items()
+        },
+        "health": health,
+        "history": {
+            "rows": len(coordinator.history),
+            "capacity": coordinator.history.capacity,
+            "columns": [name for name, _ in coordinator.history.columns],
+        },
+        "total_retries": coordinator.total_retries,
+        "metrics": metrics,
+        "sessions": coordinator.sessions.as_dict(),
+        "diversion": coordinator.diversion.as_dict() if coordinator.diversion is not None else None,
+        "fleet": coordinator.fleet.stats() if coordinator.fleet is not None else None,
+    }, TO_REDACT)
@@ -0,0 +1,109 @@
+import ipaddress
+import logging
+from datetime import timedelta
+
+from homeassistant.helpers.storage import Store
+import homeassistant.util.dt as dt_util
+
+from .const import DATA_DISCOVERY, DOMAIN
+from .findEVC import async_probe_evc, async_scan_hosts
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.discovery"
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+# How often a charger that is still answering refreshes its last_seen
+TOUCH_INTERVAL = timedelta(hours=1)
+# Addresses either side of the last known one that are tried before the
+# rest of its /24
+NEIGHBOUR_RANGE = 16
+
+
+class DiscoveryCache:
+    """Remembers where each charger serial was last seen.
+
+    The config flow offers cached chargers without re-scanning the subnet, and
+    the coordinator uses the cache to find a charger again after its DHCP
+    lease moves it to a new address.
+    """
+
+    def __init__(self, hass):
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._chargers = {}
+
+    async def async_load(self):
+        data = await self._store.async_load()
+        self._chargers = (data or {}).get("chargers", {})
+
+    def _data_to_save(self):
+        return {"chargers": self._chargers}
+
+    def get(self, serial):
+        """Return ``{"host": ..., "last_seen": ...}`` for a serial, or None."""
+        return self._chargers.get(serial)
+
+    def chargers(self):
+        """Return every cached charger as ``{"serial": ..., "host": ...}``."""
+        return [
+            {"serial": serial, "host": charger["host"]}
+            for serial, charger in self._chargers.items()
+        ]
+
+    def seen(self, serial, host):
+        """Record that ``serial`` answered at ``host``."""
+        if not serial:
+            return
+        now = dt_util.utcnow()
+        current = self._chargers.get(serial)
+        if current and current["host"] == host:
+            last_seen = dt_util.parse_datetime(current["last_seen"])
+            if last_seen and now - last_seen < TOUCH_INTERVAL:
+                return
+        self._chargers[serial] = {"host": host, "last_seen": now.isoformat()}
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_resolve(self, serial, last_host, port=502):
+        """Find ``serial`` again after it stopped answering at ``last_host``.
+
+        The cached address is tried first, then the neighbours of the last
+        known address nearest first, then the rest of its /24. Returns the new
+        host, or None if the charger was not found.
+        """
+        cached = self.get(serial)
+        if cached and cached["host"] != last_host:
+            if await self._async_matches(serial, [cached["host"]], port):
+                return cached["host"]
+
+        try:
+            last = ipaddress.IPv4Address(last_host)
+        except ValueError:
+            return None
+        network = ipaddress.IPv4Network(f"{last}/24", strict=False)
+        hosts = sorted(
+            (ip for ip in network.hosts() if ip != last),
+            key=lambda ip: abs(int(ip) - int(last)),
+        )
+        near = [str(ip) for ip in hosts if abs(int(ip) - int(last)) <= NEIGHBOUR_RANGE]
+        far = [str(ip) for ip in hosts if abs(int(ip) - int(last)) > NEIGHBOUR_RANGE]
+        for candidates in (near, far):
+            found = await self._async_matches(serial, await async_scan_hosts(candidates, port), port)
+            if found:
+                return found
+        return None
+
+    async def _async_matches(self, serial, hosts, port):
+        for charger in await async_probe_evc(hosts, port):
+            self.seen(charger["serial"], charger["host"])
+            if charger["serial"] == serial:
+                return charger["host"]
+        return None
+
+
+async def async_get_discovery_cache(hass):
+    """Return the shared discovery cache, loading it on first use."""
+    if DATA_DISCOVERY not in hass.data:
+        cache = DiscoveryCache(hass)
+        await cache.async_load()
+        hass.data[DATA_DISCOVERY] = cache
+    return hass.data[DATA_DISCOVERY]
@@ -0,0 +1,173 @@
+import logging
+import time
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN, UnitOfPower
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import (
+    CONF_DIVERSION_HYSTERESIS,
+    CONF_DIVERSION_KI,
+    CONF_DIVERSION_KP,
+    CONF_DIVERSION_MIN_DWELL,
+    CONF_DIVERSION_PHASES,
+    CONF_DIVERSION_SOURCE,
+    CONF_DIVERSION_TARGET,
+    DEFAULT_DIVERSION_HYSTERESIS,
+    DEFAULT_DIVERSION_KI,
+    DEFAULT_DIVERSION_KP,
+    DEFAULT_DIVERSION_MIN_DWELL,
+    DEFAULT_DIVERSION_PHASES,
+    DEFAULT_DIVERSION_TARGET,
+    DIVERSION_CHARGING_STATES,
+    DIVERSION_MAX_STEP,
+    DIVERSION_VOLTAGE,
+    ROLE_CHARGE_LIMIT,
+    ROLE_CHARGING_STATE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_POWER_SCALES = {UnitOfPower.WATT: 1, UnitOfPower.KILO_WATT: 1000}
+
+
+def _export_watts(state):
+    """Grid export in watts from a power sensor state, or None."""
+    if state is None or state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+        return None
+    try:
+        value = float(state.state)
+    except ValueError:
+        return None
+    return value * _POWER_SCALES.get(state.attributes.get("unit_of_measurement"), 1)
+
+
+class DiversionController:
+    """Sets the charge limit from surplus solar with a PI controller.
+
+    Steps whenever the export sensor changes, and on every coordinator
+    refresh so the charge state and current limit are caught up too; it
+    reacts as fast as the export sensor reports. The error is the export above the
+    target, in amps per phase; the integral term is clamped so the output
+    never winds up beyond the charge limit's range, and starts from the
+    current limit so taking over is bumpless. Writes go straight to the
+    charge limit register, but only when the new limit differs from the
+    last one by at least the hysteresis and the minimum dwell has passed.
+    """
+
+    def __init__(self, hass, coordinator, options):
+        self.hass = hass
+        self.coordinator = coordinator
+        self.source = options[CONF_DIVERSION_SOURCE]
+        self.target = float(options.get(CONF_DIVERSION_TARGET, DEFAULT_DIVERSION_TARGET))
+        self.phases = int(options.get(CONF_DIVERSION_PHASES, DEFAULT_DIVERSION_PHASES))
+        self.kp = float(options.get(CONF_DIVERSION_KP, DEFAULT_DIVERSION_KP))
+        self.ki = float(options.get(CONF_DIVERSION_KI, DEFAULT_DIVERSION_KI))
+        self.hysteresis = float(options.get(CONF_DIVERSION_HYSTERESIS, DEFAULT_DIVERSION_HYSTERESIS))
+        self.min_dwell = float(options.get(CONF_DIVERSION_MIN_DWELL, DEFAULT_DIVERSION_MIN_DWELL))
+        # The integral term in amps, None while not charging
+        self.integral = None
+        self.error = None
+        self.output = None
+        self.last_written = None
+        self.writes = 0
+        self._last_step = None
+        self._last_write = None
+        self._write_task = None
+        self._remove_listener = None
+        self._remove_tracker = None
+
+    @callback
+    def async_start(self):
+        self._remove_listener = self.coordinator.async_add_listener(self._async_step)
+        self._remove_tracker = async_track_state_change_event(
+            self.hass, [self.source], self._async_source_changed
+        )
+
+    @callback
+    def async_stop(self):
+        if self._remove_listener is not None:
+            self._remove_listener()
+            self._remove_listener = None
+        if self._remove_tracker is not None:
+            self._remove_tracker()
+            self._remove_tracker = None
+        if self._write_task is not None:
+            self._write_task.cancel()
+
+    def _limit_config(self):
+        name = self.coordinator.roles.get(ROLE_CHARGE_LIMIT)
+        return self.coordinator.register_map.by_name.get(name) if name else None
+
+    def _reset(self):
+        self.integral = None
+        self.error = None
+        self.output = None
+        self.last_written = None
+        self._last_step = None
+
+    @callback
+    def _async_source_changed(self, event):
+        self._async_step()
+
+    @callback
+    def _async_step(self):
+        config = self._limit_config()
+        state = self.coordinator.values.get(self.coordinator.roles.get(ROLE_CHARGING_STATE))
+        if config is None or state not in DIVERSION_CHARGING_STATES:
+            self._reset()
+            return
+        export = _export_watts(self.hass.states.get(self.source))
+        current = self.coordinator.values.get(config["name"])
+        if export is None or current is None:
+            return
+
+        low, high = config.get("min", 0), config.get("max", 100)
+        now = time.monotonic()
+        if self.integral is None:
+            self.integral = min(max(float(current), low), high)
+            step = 0.0
+        else:
+            step = min(now - self._last_step, DIVERSION_MAX_STEP)
+        self._last_step = now
+
+        self.error = (export - self.target) / (DIVERSION_VOLTAGE * self.phases)
+        proportional = self.kp * self.error
+        self.integral = min(
+            max(self.integral + self.ki * self.error * step, low - proportional),
+            high - proportional,
+        )
+        resolution = config.get("step", 1)
+        self.output = round(round((proportional + self.integral) / resolution) * resolution, 3)
+
+        if self._write_task is not None and not self._write_task.done():
+            return
+        previous = self.last_written if self.last_written is not None else float(current)
+        if abs(self.output - previous) < self.hysteresis:
+            return
+        if self._last_write is not None and now - self._last_write < self.min_dwell:
+            return
+        self._last_write = now
+        self._write_task = self.hass.async_create_task(self._async_write(config, self.output))
+
+    async def _async_write(self, config, limit):
+        raw = round(limit / config.get("scale", 1.0))
+        try:
+            await self.coordinator.async_write_registers(config["register"], [raw])
+        except Exception as err:
+            _LOGGER.warning("Solar diversion could not set %s to %s: %s", config["name"], limit, err)
+            return
+        _LOGGER.debug("Solar diversion set %s to %s", config["name"], limit)
+        self.last_written = limit
+        self.writes += 1
+
+    def as_dict(self):
+        return {
+            "source": self.source,
+            "active": self.integral is not None,
+            "error_amps": None if self.error is None else round(self.error, 3),
+            "integral_amps": None if self.integral is None else round(self.integral, 3),
+            "output_amps": self.output,
+            "last_written": self.last_written,
+            "writes": self.writes,
+        }
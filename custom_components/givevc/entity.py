@@ -0,0 +1,14 @@
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+
+class ModbusValueEntity(CoordinatorEntity):
+    """A coordinator entity showing the value of one register map entry.
+
+    When the blocks behind the entry fail to read, the entity keeps its
+    last value and reports since when in a ``stale_since`` attribute.
+    """
+
+    @property
+    def extra_state_attributes(self):
+        stale_since = self.coordinator.stale_since(self._attr_name)
+        return {"stale_since": stale_since.isoformat()} if stale_since is not None else None
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DATA_FLEET, FLEET_MAX_INFLIGHT, FLEET_STATS_WINDOW
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FleetScheduler:
+    """Drives the polls of every charger from a single timer.
+
+    Coordinators do not run their own timers. Their polls are spread evenly
+    across each poll interval so many chargers do not all fire at once, and a
+    shared semaphore caps how many Modbus transactions are in flight across
+    all chargers at any moment.
+    """
+
+    def __init__(self, hass, max_inflight=FLEET_MAX_INFLIGHT):
+        self.hass = hass
+        self.max_inflight = max_inflight
+        self.limiter = asyncio.Semaphore(max_inflight)
+        self._coordinators = {}
+        self._next_poll = {}
+        self._polling = set()
+        self._unsub_timer = None
+        # (finished at, seconds, ok) for recent transactions
+        self._transactions = deque(maxlen=10000)
+        self.inflight = 0
+        self.peak_inflight = 0
+
+    def add(self, coordinator):
+        self._coordinators[coordinator.entry.entry_id] = coordinator
+        self._rebalance()
+
+    def remove(self, coordinator):
+        entry_id = coordinator.entry.entry_id
+        self._coordinators.pop(entry_id, None)
+        self._next_poll.pop(entry_id, None)
+        self._polling.discard(entry_id)
+        if self._coordinators:
+            self._rebalance()
+        elif self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    @callback
+    def async_reschedule(self, coordinator, delay=0.0):
+        """Bring a coordinator's next poll forward to ``delay`` seconds."""
+        entry_id = coordinator.entry.entry_id
+        if entry_id not in self._coordinators:
+            return
+        due = time.monotonic() + delay
+        if due < self._next_poll.get(entry_id, float("inf")):
+            self._next_poll[entry_id] = due
+            self._schedule()
+
+    def _rebalance(self):
+        """Give each coordinator its own phase within its poll interval."""
+        now = time.monotonic()
+        count = len(self._coordinators)
+        for index, entry_id in enumerate(sorted(self._coordinators)):
+            interval = self._coordinators[entry_id].poll_interval.total_seconds()
+            self._next_poll[entry_id] = now + interval * (index + 1) / count
+        self._schedule()
+
+    def _schedule(self):
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if not self._next_poll:
+            return
+        delay = max(0.0, min(self._next_poll.values()) - time.monotonic())
+        self._unsub_timer = async_call_later(self.hass, delay, self._async_tick)
+
+    @callback
+    def _async_tick(self, _now):
+        self._unsub_timer = None
+        now = time.monotonic()
+        for entry_id, due in list(self._next_poll.items()):
+            if due > now:
+                continue
+            coordinator = self._coordinators[entry_id]
+            interval = coordinator.poll_interval.total_seconds()
+            # Keep the phase, unless the poll has fallen a whole interval behind
+            self._next_poll[entry_id] = due + interval if due + interval > now else now + interval
+            if entry_id in self._polling:
+                _LOGGER.debug("Skipping poll of %s; the previous one is still running", coordinator.host)
+                continue
+            self._polling.add(entry_id)
+            self.hass.async_create_task(self._async_poll(entry_id, coordinator))
+        self._schedule()
+
+    async def _async_poll(self, entry_id, coordinator):
+        try:
+            await coordinator.async_refresh()
+        finally:
+            self._polling.discard(entry_id)
+
+    async def async_transact(self, func, *args, **kwargs):
+        """Run one Modbus transaction under the fleet-wide in-flight cap."""
+        async with self.limiter:
+            self.inflight += 1
+            self.peak_inflight = max(self.peak_inflight, self.inflight)
+            start = time.monotonic()
+            ok = False
+            try:
+                result = await func(*args, **kwargs)
+                ok = not result.isError()
+                return result
+            finally:
+                self.inflight -= 1
+                end = time.monotonic()
+                self._transactions.append((end, end - start, ok))
+
+    def stats(self):
+        """Return aggregate throughput and latency over the recent window."""
+        now = time.monotonic()
+        recent = [t for t in self._transactions if now - t[0] <= FLEET_STATS_WINDOW]
+        latencies = sorted(t[1] for t in recent)
+        stats = {
+            "chargers": len(self._coordinators),
+            "max_inflight": self.max_inflight,
+            "inflight": self.inflight,
+            "peak_inflight": self.peak_inflight,
+            "window_seconds": FLEET_STATS_WINDOW,
+            "transactions": len(recent),
+            "errors": sum(1 for t in recent if not t[2]),
+            "transactions_per_second": round(len(recent) / FLEET_STATS_WINDOW, 3),
+            "latency_mean_ms": None,
+            "latency_p95_ms": None,
+        }
+        if latencies:
+            stats["latency_mean_ms"] = round(1000 * sum(latencies) / len(latencies), 2)
+            stats["latency_p95_ms"] = round(1000 * latencies[int(0.95 * (len(latencies) - 1))], 2)
+        return stats
+
+
+def async_get_fleet(hass):
+    """Return the scheduler shared by every config entry."""
+    if DATA_FLEET not in hass.data:
+        hass.data[DATA_FLEET] = FleetScheduler(hass)
+    return hass.data[DATA_FLEET]
@@ -1,35 +1,125 @@
-from homeassistant.components.sensor import SensorEntity
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from .const import DOMAIN
+from abc import ABC, abstractmethod
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
-    coordinator = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([ModbusHealthSensor(coordinator)])
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.util import slugify
 
-class ModbusHealthSensor(SensorEntity):
-    def __init__(self, coordinator):
-        self.coordinator = coordinator
-        self._attr_name = "Modbus Connection Health"
-        self._attr_icon = "mdi:lan-connect"
+from .const import SIGNAL_HEALTH
 
-    @property
-    def unique_id(self):
-        return f"modbus_health_{self.coordinator.client.host}"
+# Health sensors: (name, key in ModbusCoordinator.health(), device class,
+# unit, state class, enabled by default)
+HEALTH_SENSORS = (
+    ("Consecutive Failures", "consecutive_failures", None, None, SensorStateClass.MEASUREMENT, True),
+    ("Poll Success Rate", "success_rate", None, PERCENTAGE, SensorStateClass.MEASUREMENT, True),
+    (
+        "Poll Latency Mean",
+        "latency_mean_ms",
+        SensorDeviceClass.DURATION,
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+        True,
+    ),
+    (
+        "Poll Latency p95",
+        "latency_p95_ms",
+        SensorDeviceClass.DURATION,
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+        True,
+    ),
+    # Shown by the frontend as the time since the last good read. It moves
+    # on every successful poll, so it is off unless asked for.
+    ("Last Good Read", "last_success_time", SensorDeviceClass.TIMESTAMP, None, None, False),
+)
 
-    @property
-    def state(self):
-        return "connected" if self.coordinator.last_success else "disconnected"
 
-    @property
-    def device_class(self):
-        return "connectivity"
+class ModbusHealthEntity(ABC):
+    """Updated from the coordinator's health signal after every poll.
+
+    Health entities do not poll and are not coordinator listeners, so they
+    stay available (and keep counting) while the charger is unreachable.
+    State is only written when what the entity shows has changed.
+    """
+
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator, serial, name):
+        self.coordinator = coordinator
+        self.serial = serial
+        self._attr_name = name
+        self._attr_unique_id = f"givevc_{serial}_{slugify(name)}"
+        self._shown = None
 
     @property
     def device_info(self):
         return {
-            "identifiers": {(DOMAIN, f"modbus_{self.coordinator.unit_id}_{self.coordinator.client.host}")},
-            "name": f"Modbus @ {self.coordinator.client.host}",
-            "manufacturer": "Modbus",
-            "model": "Generic Modbus TCP"
-        }
\ No newline at end of file
+            "identifiers": {(f"givevc_{self.serial}")},
+            "name": "GivEVC",
+            "manufacturer": "GivEnergy",
+            "model": "GivEVC",
+            "serial_number": self.serial,
+        }
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self._shown = self._apply_health(self.coordinator.health())
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_HEALTH.format(self.coordinator.entry.entry_id),
+                self._async_health_updated,
+            )
+        )
+
+    @callback
+    def _async_health_updated(self, health):
+        shown = self._apply_health(health)
+        if shown != self._shown:
+            self._shown = shown
+            self.async_write_ha_state()
+
+    @abstractmethod
+    def _apply_health(self, health):
+        """Set the entity's state from a ``ModbusCoordinator.health()`` dict.
+
+        Returns what the entity now shows, to compare with the last time.
+        """
+
+
+class ModbusHealthSensor(ModbusHealthEntity, SensorEntity):
+    def __init__(self, coordinator, serial, name, key, device_class, unit, state_class, enabled):
+        super().__init__(coordinator, serial, name)
+        self._key = key
+        self._attr_device_class = device_class
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+        self._attr_entity_registry_enabled_default = enabled
+
+    def _apply_health(self, health):
+        self._attr_native_value = health[self._key]
+        return self._attr_native_value
+
+
+class ModbusConnectivitySensor(ModbusHealthEntity, BinarySensorEntity):
+    _attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
+
+    def __init__(self, coordinator, serial):
+        super().__init__(coordinator, serial, "Modbus Connection")
+
+    def _apply_health(self, health):
+        self._attr_is_on = health["connected"]
+        self._attr_extra_state_attributes = {
+            "host": self.coordinator.host,
+            "last_error": health["last_error"],
+        }
+        return self._attr_is_on, self._attr_extra_state_attributes
+
+
+def health_sensors(coordinator, serial):
+    return [
+        ModbusHealthSensor(coordinator, serial, *description) for description in HEALTH_SENSORS
+    ]
@@ -1,25 +1,144 @@
 import struct
+import sys
+from array import array
 
-def decode_float(registers, byte_order="ABCD"):
-    raw = struct.pack(">HH", registers[0], registers[1])
+# A register image is decoded straight from the memory of its array('H'),
+# where each register is stored in the host's byte order. Reading that
+# buffer big- or little-endian gives two of the four 32-bit byte orders
+# without copying; the other two need each word's bytes swapped, which is
+# done per value on the two registers it spans rather than on the image.
+# Byte orders map to (buffer, struct endianness), where the buffer holds the
+# registers either in wire (big-endian) order or with each word swapped.
+_WIRE = 0
+_SWAPPED = 1
+_BYTE_ORDERS = {
+    "ABCD": (_WIRE, ">"),
+    "DCBA": (_WIRE, "<"),
+    "BADC": (_SWAPPED, ">"),
+    "CDAB": (_SWAPPED, "<"),
+}
+_TYPES = {
+    "u16": "H",
+    "s16": "h",
+    "u32": "I",
+    "s32": "i",
+    "float32": "f",
+}
+if sys.byteorder == "little":
+    _NATIVE, _NATIVE_ENDIAN, _FOREIGN_ENDIAN = _SWAPPED, "<", ">"
+else:
+    _NATIVE, _NATIVE_ENDIAN, _FOREIGN_ENDIAN = _WIRE, ">", "<"
+_NATIVE_WORDS = struct.Struct(_NATIVE_ENDIAN + "2H")
+_FOREIGN_WORDS = struct.Struct(_FOREIGN_ENDIAN + "2H")
+
+
+def image_buffer(image):
+    """Return the native byte view of a register image.
+
+    ``image`` is a list or ``array('H')`` of register values, or bytes-like
+    data holding the registers in wire order. An ``array('H')`` is viewed
+    in place.
+    """
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        registers = array("H")
+        registers.frombytes(image)
+        if sys.byteorder == "little":
+            registers.byteswap()
+    elif isinstance(image, array) and image.typecode == "H":
+        registers = image
+    else:
+        registers = array("H", image)
+    return memoryview(registers).cast("B")
+
+
+def _swapped_unpacker(unpacker):
+    """Unpack a 32-bit value from the word-swapped copy of two registers."""
+    read_words = _NATIVE_WORDS.unpack_from
+    swap_words = _FOREIGN_WORDS.pack
+    unpack = unpacker.unpack
+
+    def unpack_from(buffer, offset):
+        return unpack(swap_words(*read_words(buffer, offset)))
+    return unpack_from
+
+
+def compile_specs(specs):
+    """Compile ``(offset, type, byte_order, scale)`` specs for ``decode_batch``.
+
+    ``type`` is one of u16, s16, u32, s32 or float32 and ``byte_order`` one
+    of ABCD, DCBA, BADC or CDAB (ignored for 16-bit types); offsets count
+    registers from the start of the image and cannot be negative. Compile
+    once and pass the result to ``decode_batch`` for every image.
+    """
+    compiled = []
+    for offset, value_type, byte_order, scale in specs:
+        if value_type not in _TYPES:
+            raise ValueError(f"Unsupported register type '{value_type}'")
+        if offset < 0:
+            raise ValueError(f"Negative register offset {offset}")
+        code = _TYPES[value_type]
+        if code in "Hh":
+            buffer, endian = _NATIVE, _NATIVE_ENDIAN
+        elif (byte_order or "ABCD") in _BYTE_ORDERS:
+            buffer, endian = _BYTE_ORDERS[byte_order or "ABCD"]
+        else:
+            raise ValueError(f"Unsupported byte order '{byte_order}'")
+        unpacker = struct.Struct(endian + code)
+        unpack_from = unpacker.unpack_from if buffer == _NATIVE else _swapped_unpacker(unpacker)
+        compiled.append((unpack_from, offset * 2, offset * 2 + unpacker.size, scale))
+    return compiled
+
+
+def decode_batch(image, specs):
+    """Decode every compiled spec from a register image in one pass.
+
+    ``specs`` is the output of ``compile_specs``. Values are multiplied by
+    their scale (when it is not 1); values that fall outside the image
+    decode to None.
+    """
+    buffer = image_buffer(image)
+    size = len(buffer)
+    values = []
+    append = values.append
+    for unpack_from, start, end, scale in specs:
+        if end > size:
+            append(None)
+            continue
+        value = unpack_from(buffer, start)[0]
+        append(value if scale == 1 else value * scale)
+    return values
+
+
+def encode_32(value, value_type, byte_order="ABCD"):
+    """Encode a 32-bit value into two registers, the inverse of ``decode_batch``."""
+    raw = struct.pack(">" + _TYPES[value_type], value)
+    byte_order = byte_order or "ABCD"
+    if byte_order not in _BYTE_ORDERS:
+        raise ValueError(f"Unsupported byte order '{byte_order}'")
     if byte_order == "DCBA":
         raw = raw[::-1]
     elif byte_order == "BADC":
-        raw = raw[1:2] + raw[0:1] + raw[3:4] + raw[2:3]
+        raw = raw[1::-1] + raw[3:1:-1]
     elif byte_order == "CDAB":
-        raw = raw[2:4] + raw[0:2]
-    return struct.unpack(">f", raw)[0]
+        raw = raw[2:] + raw[:2]
+    return list(struct.unpack(">2H", raw))
+
+
+def _decode_32(registers, value_type, byte_order):
+    spec = compile_specs([(0, value_type, byte_order, 1)])
+    return decode_batch(registers[:2], spec)[0]
+
+
+def decode_float(registers, byte_order="ABCD"):
+    return _decode_32(registers, "float32", byte_order)
 
 def decode_unsigned_32(registers, byte_order="ABCD"):
     """Decode two 16-bit Modbus registers into an unsigned 32-bit integer.
     Supports the same byte orders as the float/signed helpers: ABCD (default),
     DCBA, BADC, CDAB.
     """
-    raw = struct.pack(">HH", registers[0], registers[1])
-    if byte_order == "DCBA":
-        raw = raw[::-1]
-    elif byte_order == "BADC":
-        raw = raw[1:2] + raw[0:1] + raw[3:4] + raw[2:3]
-    elif byte_order == "CDAB":
-        raw = raw[2:4] + raw[0:2]
-    return struct.unpack(">I", raw)[0]
\ No newline at end of file
+    return _decode_32(registers, "u32", byte_order)
+
+def decode_signed_32(registers, byte_order="ABCD"):
+    """Decode two 16-bit Modbus registers into a signed 32-bit integer."""
+    return _decode_32(registers, "s32", byte_order)
@@ -0,0 +1,169 @@
+import csv
+import gzip
+import operator
+import struct
+import sys
+from array import array
+from datetime import datetime, timezone
+
+from .const import HISTORY_CAPACITY
+from .decoder import value_type
+
+# struct codes for the decoder's value types; every row is stored in
+# ABCD (big-endian) order so one struct decodes all columns
+_CODES = {"u16": "H", "s16": "h", "u32": "I", "s32": "i", "float32": "f"}
+
+
+def _swap_bytes(register):
+    return ((register & 0xFF) << 8) | (register >> 8)
+
+
+class RegisterHistory:
+    """A fixed-size ring buffer of timestamped raw register snapshots.
+
+    Covers the register map entries marked ``"history": true``. Each row
+    holds just those entries' registers, normalised to ABCD order, in one
+    preallocated ``array('H')``; timestamps go in a parallel ``array('d')``.
+    Values are only scaled when a window is read back.
+    """
+
+    def __init__(self, register_map, capacity=HISTORY_CAPACITY):
+        self.columns = []
+        self._sources = []
+        codes = ">"
+        for config in register_map:
+            if not config.get("history"):
+                continue
+            register_type = value_type(config)
+            width = 1 if register_type in ("u16", "s16") else 2
+            self.columns.append((config["name"], config.get("scale", 1.0)))
+            self._sources.append((config["register"], width, config.get("byte_order") or "ABCD"))
+            codes += _CODES[register_type]
+        self.layout = (tuple(self.columns), tuple(self._sources), codes)
+        self.row_size = sum(width for _, width, _ in self._sources)
+        self._row = struct.Struct(codes)
+        self.capacity = capacity if self.columns else 0
+        self._times = array("d", bytes(8 * self.capacity))
+        self._rows = array("H", bytes(2 * self.capacity * self.row_size))
+        self._next = 0
+        self.count = 0
+
+    @property
+    def addresses(self):
+        return {
+            address + offset
+            for address, width, _ in self._sources
+            for offset in range(width)
+        }
+
+    def append(self, timestamp, image):
+        """Record the history registers of ``image`` at ``timestamp``."""
+        if not self.capacity:
+            return
+        offset = self._next * self.row_size
+        rows = self._rows
+        for address, width, byte_order in self._sources:
+            if width == 1:
+                rows[offset] = image[address]
+            else:
+                high, low = image[address], image[address + 1]
+                if byte_order in ("CDAB", "DCBA"):
+                    high, low = low, high
+                if byte_order in ("BADC", "DCBA"):
+                    high, low = _swap_bytes(high), _swap_bytes(low)
+                rows[offset] = high
+                rows[offset + 1] = low
+            offset += width
+        self._times[self._next] = timestamp
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def snapshot(self):
+        """A copy to read outside the event loop while this one keeps filling."""
+        copy = object.__new__(RegisterHistory)
+        copy.__dict__.update(self.__dict__)
+        copy._times = array("d", self._times)
+        copy._rows = array("H", self._rows)
+        return copy
+
+    def _chunks(self):
+        """The (first row, row count) runs of the ring in time order."""
+        if self.count < self.capacity:
+            return [(0, self.count)]
+        return [(self._next, self.capacity - self._next), (0, self._next)]
+
+    def rows(self, start=None, end=None):
+        """Yield ``(timestamp, values)`` for rows from ``start`` to ``end``.
+
+        Rows are decoded a chunk at a time with ``struct.iter_unpack`` over
+        the raw buffer, then scaled.
+        """
+        scales = [scale for _, scale in self.columns]
+        for first, count in self._chunks():
+            if not count:
+                continue
+            chunk = self._rows[first * self.row_size:(first + count) * self.row_size]
+            if sys.byteorder == "little":
+                chunk.byteswap()
+            times = self._times[first:first + count]
+            for timestamp, raw in zip(times, self._row.iter_unpack(chunk)):
+                if (start is not None and timestamp < start) or (end is not None and timestamp > end):
+                    continue
+                yield timestamp, [round(value * scale, 3) for value, scale in zip(raw, scales)]
+
+    def __len__(self):
+        return self.count
+
+
+def downsample(rows, bucket):
+    """Reduce ``(timestamp, values)`` rows to per-bucket min, max and mean.
+
+    Yields ``(bucket start, samples, mins, maxs, means)`` for every bucket
+    of ``bucket`` seconds that holds at least one row.
+    """
+    current = None
+    for timestamp, values in rows:
+        key = timestamp - timestamp % bucket
+        if key != current:
+            if current is not None:
+                yield current, samples, mins, maxs, [total / samples for total in totals]
+            current, samples = key, 1
+            mins, maxs, totals = list(values), list(values), list(values)
+            continue
+        samples += 1
+        mins = list(map(min, mins, values))
+        maxs = list(map(max, maxs, values))
+        totals = list(map(operator.add, totals, values))
+    if current is not None:
+        yield current, samples, mins, maxs, [total / samples for total in totals]
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="milliseconds")
+
+
+def write_csv(path, history, start=None, end=None, bucket=0):
+    """Write a window of ``history`` to a gzip-compressed CSV file.
+
+    With a ``bucket`` (seconds), each column becomes min, max and mean per
+    bucket. Returns the number of rows written.
+    """
+    names = [name for name, _ in history.columns]
+    written = 0
+    with gzip.open(path, "wt", newline="") as f:
+        writer = csv.writer(f)
+        rows = history.rows(start, end)
+        if bucket:
+            writer.writerow(
+                ["time", "samples"]
+                + [f"{name} {stat}" for stat in ("min", "max", "mean") for name in names]
+            )
+            for timestamp, samples, mins, maxs, means in downsample(rows, bucket):
+                writer.writerow([_iso(timestamp), samples] + mins + maxs + [round(mean, 3) for mean in means])
+                written += 1
+        else:
+            writer.writerow(["time"] + names)
+            for timestamp, values in rows:
+                writer.writerow([_iso(timestamp)] + values)
+                written += 1
+    return written
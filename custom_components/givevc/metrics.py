@@ -0,0 +1,180 @@
+import time
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime, timezone
+
+from .const import METRICS_HISTORY, METRICS_MAX_SAMPLES, METRICS_WINDOW
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# Modbus TCP framing: a 7-byte MBAP header on every frame, plus the PDU
+_MBAP_SIZE = 7
+
+
+def read_bytes(count):
+    """Bytes on the wire for one read of ``count`` holding registers."""
+    return (_MBAP_SIZE + 5) + (_MBAP_SIZE + 2 + 2 * count)
+
+
+def write_bytes(count):
+    """Bytes on the wire for one write of ``count`` registers."""
+    return (_MBAP_SIZE + 6 + 2 * count) + (_MBAP_SIZE + 5)
+
+
+def _ms(seconds):
+    return round(1000 * seconds, 3)
+
+
+def _percentile(ordered, fraction):
+    return _ms(ordered[int(fraction * (len(ordered) - 1))])
+
+
+class RollingHistogram:
+    """Durations (seconds) recorded over a rolling time window."""
+
+    def __init__(self, window=METRICS_WINDOW, max_samples=METRICS_MAX_SAMPLES):
+        self.window = window
+        self._samples = deque(maxlen=max_samples)
+        self.total = 0
+        self.last = None
+
+    def add(self, seconds):
+        self._samples.append((time.monotonic(), seconds))
+        self.total += 1
+        self.last = seconds
+
+    def recent(self):
+        cutoff = time.monotonic() - self.window
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        return [seconds for _, seconds in self._samples]
+
+    def summary(self):
+        """Count, mean, percentiles and max over the window, in milliseconds."""
+        samples = sorted(self.recent())
+        summary = {
+            "count": len(samples),
+            "mean_ms": None,
+            "p50_ms": None,
+            "p95_ms": None,
+            "p99_ms": None,
+            "max_ms": None,
+            "last_ms": None if self.last is None else _ms(self.last),
+        }
+        if samples:
+            summary["mean_ms"] = _ms(sum(samples) / len(samples))
+            for name, fraction in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+                summary[name] = _percentile(samples, fraction)
+            summary["max_ms"] = _ms(samples[-1])
+        return summary
+
+    def histogram(self):
+        """Sample counts per bucket, keyed by the bucket's upper bound in ms."""
+        counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        for seconds in self.recent():
+            counts[bisect_left(HISTOGRAM_BOUNDS_MS, 1000 * seconds)] += 1
+        labels = [f"le_{bound}" for bound in HISTOGRAM_BOUNDS_MS] + ["inf"]
+        return dict(zip(labels, counts))
+
+    def percentile(self, fraction):
+        samples = sorted(self.recent())
+        return _percentile(samples, fraction) if samples else None
+
+    def mean(self):
+        samples = self.recent()
+        return _ms(sum(samples) / len(samples)) if samples else None
+
+
+class PollMetrics:
+    """Timing and traffic figures for one charger.
+
+    Separates time spent waiting on the charger (block round trips and
+    connects) from time spent in Home Assistant (decoding and entity
+    dispatch), so a lagging poll can be pinned on one or the other.
+    """
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        self.block_rtt = RollingHistogram(window)
+        self.blocks = {}
+        self.poll = RollingHistogram(window)
+        self.connect = RollingHistogram(window)
+        self.decode = RollingHistogram(window)
+        self.dispatch = RollingHistogram(window)
+        self.write = RollingHistogram(window)
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.read_errors = 0
+        self.write_errors = 0
+        self.retries = 0
+        # (monotonic time, ok) for every poll, and the latest polls in full
+        self._polls = deque(maxlen=METRICS_MAX_SAMPLES)
+        self.history = deque(maxlen=METRICS_HISTORY)
+
+    def record_poll(self, ok, seconds, blocks_read, error=None):
+        """Record a whole poll.
+
+        Successful polls count towards poll latency and the success rate
+        only when they read at least one block; ticks with nothing due
+        would drag latency down and pad the success rate.
+        """
+        if not ok or blocks_read:
+            self._polls.append((time.monotonic(), ok))
+        if ok and blocks_read:
+            self.poll.add(seconds)
+        self.history.append(
+            {
+                "time": datetime.now(timezone.utc).isoformat(),
+                "ok": ok,
+                "duration_ms": _ms(seconds),
+                "blocks_read": blocks_read,
+                "error": error,
+            }
+        )
+
+    def success_rate(self):
+        """Percentage of polls in the window that succeeded, or None."""
+        cutoff = time.monotonic() - self.window
+        while self._polls and self._polls[0][0] < cutoff:
+            self._polls.popleft()
+        if not self._polls:
+            return None
+        return round(100 * sum(1 for _, ok in self._polls if ok) / len(self._polls), 1)
+
+    def record_read(self, start, count, seconds):
+        self.block_rtt.add(seconds)
+        block = self.blocks.get((start, count))
+        if block is None:
+            block = self.blocks[(start, count)] = RollingHistogram(self.window)
+        block.add(seconds)
+        self.bytes_read += read_bytes(count)
+
+    def record_write(self, count):
+        self.bytes_written += write_bytes(count)
+
+    @property
+    def bytes_transferred(self):
+        return self.bytes_read + self.bytes_written
+
+    def as_dict(self):
+        return {
+            "window_seconds": self.window,
+            "block_rtt": {**self.block_rtt.summary(), "histogram": self.block_rtt.histogram()},
+            "blocks": {
+                f"{start}+{count}": histogram.summary()
+                for (start, count), histogram in sorted(self.blocks.items())
+            },
+            "poll": self.poll.summary(),
+            "success_rate": self.success_rate(),
+            "connect": self.connect.summary(),
+            "decode": self.decode.summary(),
+            "dispatch": self.dispatch.summary(),
+            "write": self.write.summary(),
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "read_errors": self.read_errors,
+            "retries": self.retries,
+            "write_errors": self.write_errors,
+            "history": list(self.history),
+        }
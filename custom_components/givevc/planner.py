@@ -0,0 +1,122 @@
+import logging
+
+from .const import POLL_TIERS, POLL_TIER_FAST, POLL_TIER_NORMAL, POLL_TIER_STATIC
+
+_LOGGER = logging.getLogger(__name__)
+
+MODBUS_MAX_READ = 125
+MODBUS_MAX_ADDRESS = 0xFFFF
+_NEVER = float("inf")
+
+
+def entry_addresses(config):
+    """Return every register address referenced by a register map entry.
+
+    Plain values use one register, floats and 32-bit values (anything with a
+    byte order) use two, and timestamps use the hour, minute and second
+    registers. Compiled register maps carry the list as ``"addresses"``.
+    """
+    if "addresses" in config:
+        return config["addresses"]
+    register = config["register"]
+    if config.get("type") == "timestamp":
+        addresses = [register]
+        for key in ("register_minute", "register_second"):
+            if config.get(key) is not None:
+                addresses.append(config[key])
+        return addresses
+    width = 2 if config.get("float") or config.get("byte_order") else 1
+    return list(range(register, register + width))
+
+
+def entry_interval(config, scan_interval):
+    """Return how often (seconds) an entry is polled, or None if static.
+
+    An explicit ``scan_interval`` on the entry wins over its ``poll`` tier.
+    The "fast" tier is never slower, and "slow" never faster, than the
+    config entry's own scan interval.
+    """
+    if config.get("scan_interval") is not None:
+        return max(1, float(config["scan_interval"]))
+    tier = config.get("poll", POLL_TIER_NORMAL)
+    if tier == POLL_TIER_STATIC:
+        return None
+    if tier == POLL_TIER_NORMAL:
+        return float(scan_interval)
+    if tier not in POLL_TIERS:
+        _LOGGER.warning("Unknown poll tier '%s' for '%s'; using the scan interval", tier, config.get("name"))
+        return float(scan_interval)
+    if tier == POLL_TIER_FAST:
+        return float(min(POLL_TIERS[tier], scan_interval))
+    return float(max(POLL_TIERS[tier], scan_interval))
+
+
+def plan_tiers(register_map, scan_interval, max_block_size=MODBUS_MAX_READ, max_gap=0):
+    """Plan block reads separately for each poll interval in the map.
+
+    Neighbouring addresses with the same interval are merged while the run of
+    unused registers between them is at most ``max_gap`` and the block stays
+    within ``max_block_size`` registers. Returns a sorted list of
+    ``(start, count, interval)`` tuples, where ``interval`` is in seconds or
+    None for static blocks. An address referenced at more than one interval
+    is polled at the fastest of them, and an address that a faster block
+    already reads (including the gaps it reads through) is not read again.
+    """
+    by_address = {}
+    for config in register_map:
+        interval = entry_interval(config, scan_interval)
+        for address in _collect_addresses([config]):
+            current = by_address.get(address, _NEVER)
+            by_address[address] = min(current, _NEVER if interval is None else interval)
+
+    by_interval = {}
+    for address, interval in by_address.items():
+        by_interval.setdefault(interval, set()).add(address)
+
+    blocks = []
+    covered = set()
+    for interval in sorted(by_interval):
+        for start, count in _merge(by_interval[interval] - covered, max_block_size, max_gap):
+            blocks.append((start, count, None if interval == _NEVER else interval))
+            covered.update(range(start, start + count))
+    return sorted(blocks)
+
+
+def _collect_addresses(register_map):
+    addresses = set()
+    for config in register_map:
+        try:
+            referenced = entry_addresses(config)
+        except (KeyError, TypeError):
+            _LOGGER.warning("Skipping register map entry without a register: %s", config.get("name"))
+            continue
+        for address in referenced:
+            if not isinstance(address, int) or not 0 <= address <= MODBUS_MAX_ADDRESS:
+                _LOGGER.warning(
+                    "Register %s of '%s' is out of range; it will not be read",
+                    address,
+                    config.get("name"),
+                )
+                continue
+            addresses.add(address)
+    return addresses
+
+
+def _merge(addresses, max_block_size, max_gap):
+    max_block_size = max(1, min(int(max_block_size), MODBUS_MAX_READ))
+    blocks = []
+    start = end = None
+    for address in sorted(addresses):
+        if (
+            start is not None
+            and address - end - 1 <= max_gap
+            and address - start < max_block_size
+        ):
+            end = address
+            continue
+        if start is not None:
+            blocks.append((start, end - start + 1))
+        start = end = address
+    if start is not None:
+        blocks.append((start, end - start + 1))
+    return blocks
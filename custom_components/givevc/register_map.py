@@ -0,0 +1,168 @@
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+import voluptuous as vol
+
+from .const import POLL_TIER_FAST, POLL_TIER_NORMAL, POLL_TIER_SLOW, POLL_TIER_STATIC
+from .planner import MODBUS_MAX_ADDRESS, entry_addresses
+
+_LOGGER = logging.getLogger(__name__)
+
+MAP_FILE = Path(__file__).parent / "register_map.json"
+
+BYTE_ORDERS = ("ABCD", "DCBA", "BADC", "CDAB")
+
+# The Home Assistant platform that creates each entry type's entities
+ENTRY_PLATFORMS = {
+    "sensor": "sensor",
+    "timestamp": "sensor",
+    "number": "number",
+    "select": "select",
+    "switch": "switch",
+}
+
+
+def _address(value):
+    """Accept a register as an int or a string such as "12" or "0x0C"."""
+    if isinstance(value, str):
+        try:
+            value = int(value, 0)
+        except ValueError as err:
+            raise vol.Invalid(f"invalid register '{value}'") from err
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise vol.Invalid(f"invalid register {value!r}")
+    if not 0 <= value <= MODBUS_MAX_ADDRESS:
+        raise vol.Invalid(f"register {value} is out of range")
+    return value
+
+
+def _lookup(value):
+    """Normalise a lookup table to ``{raw int: state}``."""
+    if not isinstance(value, dict):
+        raise vol.Invalid("lookup must be a mapping of raw values to states")
+    try:
+        return {int(key, 0) if isinstance(key, str) else int(key): str(state) for key, state in value.items()}
+    except (TypeError, ValueError) as err:
+        raise vol.Invalid(f"invalid lookup key: {err}") from err
+
+
+ENTRY_SCHEMA = vol.Schema(
+    {
+        vol.Required("name"): vol.All(str, vol.Length(min=1)),
+        vol.Required("type"): vol.In(ENTRY_PLATFORMS),
+        vol.Required("register"): _address,
+        vol.Optional("register_minute"): _address,
+        vol.Optional("register_second"): _address,
+        vol.Optional("unit"): vol.Any(None, str),
+        vol.Optional("device_class"): vol.Any(None, str),
+        vol.Optional("scale"): vol.Coerce(float),
+        vol.Optional("float"): bool,
+        vol.Optional("signed"): bool,
+        vol.Optional("byte_order"): vol.Any(None, vol.In(BYTE_ORDERS)),
+        vol.Optional("lookup"): vol.Any(None, _lookup),
+        vol.Optional("poll"): vol.In((POLL_TIER_FAST, POLL_TIER_NORMAL, POLL_TIER_SLOW, POLL_TIER_STATIC)),
+        vol.Optional("scan_interval"): vol.All(vol.Coerce(float), vol.Range(min=1)),
+        vol.Optional("role"): str,
+        vol.Optional("history"): bool,
+        vol.Optional("min"): vol.Coerce(float),
+        vol.Optional("max"): vol.Coerce(float),
+        vol.Optional("step"): vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False)),
+        vol.Optional("mode"): vol.In(("auto", "box", "slider")),
+        vol.Optional("invert"): bool,
+        vol.Optional("write_on"): vol.Coerce(int),
+        vol.Optional("write_off"): vol.Coerce(int),
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+
+class RegisterMap:
+    """A validated register map, compiled once per version of the file.
+
+    Entries have their registers resolved to ints, lookups normalised to
+    ``{raw int: state}`` and the addresses they read listed under
+    ``"addresses"``. Iterating yields the entries in file order; they are
+    also indexed by name, by the platform that creates them and by role.
+    """
+
+    def __init__(self, entries, digest=None):
+        self.entries = entries
+        self.digest = digest
+        self.by_name = {config["name"]: config for config in entries}
+        self.roles = {config["role"]: config["name"] for config in entries if config.get("role")}
+        self.by_platform = {}
+        for config in entries:
+            self.by_platform.setdefault(ENTRY_PLATFORMS[config["type"]], []).append(config)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def platforms(self):
+        """The platforms that have at least one entity in this map."""
+        return list(self.by_platform)
+
+    def platform(self, platform):
+        return self.by_platform.get(platform, [])
+
+
+def compile_map(raw_entries, digest=None):
+    """Validate and compile a parsed register map.
+
+    Invalid entries are logged and left out rather than failing the whole
+    map, as are entries whose name is already taken.
+    """
+    if not isinstance(raw_entries, list):
+        _LOGGER.error("The register map must be a list of entries")
+        return RegisterMap([], digest)
+    entries = []
+    names = set()
+    for index, raw in enumerate(raw_entries):
+        name = raw.get("name") if isinstance(raw, dict) else None
+        try:
+            config = ENTRY_SCHEMA(raw)
+        except vol.Invalid as err:
+            _LOGGER.error("Skipping register map entry %s (%s): %s", index, name, err)
+            continue
+        if config["name"] in names:
+            _LOGGER.error("Skipping register map entry %s: duplicate name '%s'", index, name)
+            continue
+        if config.get("lookup") is None:
+            config.pop("lookup", None)
+        config["addresses"] = entry_addresses(config)
+        names.add(config["name"])
+        entries.append(config)
+    return RegisterMap(entries, digest)
+
+
+# Compiled maps keyed by the digest of the file they came from, shared by
+# every config entry and reused across reloads while the file is unchanged
+_COMPILED = {}
+
+
+def load_register_map(path=MAP_FILE):
+    """Read, validate and compile a register map file, using the cache."""
+    try:
+        content = Path(path).read_bytes()
+    except OSError as err:
+        _LOGGER.error("Cannot read register map %s: %s", path, err)
+        return RegisterMap([])
+    digest = hashlib.sha256(content).hexdigest()[:16]
+    if digest not in _COMPILED:
+        try:
+            raw_entries = json.loads(content)
+        except ValueError as err:
+            _LOGGER.error("Cannot parse register map %s: %s", path, err)
+            return RegisterMap([], digest)
+        _COMPILED[digest] = compile_map(raw_entries, digest)
+        _LOGGER.debug("Compiled register map %s: %d entries", digest, len(_COMPILED[digest]))
+    return _COMPILED[digest]
+
+
+async def async_load_register_map(hass, path=MAP_FILE):
+    return await hass.async_add_executor_job(load_register_map, path)
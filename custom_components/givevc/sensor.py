@@ -1,55 +1,63 @@
-from datetime import datetime
 import logging
-from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import entity_registry as er
 from homeassistant.util import slugify
-import homeassistant.util.dt as dt_util
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
-from .helpers import decode_float, decode_unsigned_32
+from .entity import ModbusValueEntity
+from .health import health_sensors
+from .sessions import session_sensors
 
 _LOGGER = logging.getLogger(__name__)
 
+# Poll metric sensors: (name, metric series, reader); series readers return
+# milliseconds over the metrics window
+METRIC_SENSORS = (
+    ("Block Read RTT p95", "block_rtt", lambda series: series.percentile(0.95)),
+    ("Poll Duration p95", "poll", lambda series: series.percentile(0.95)),
+    ("Connect Time", "connect", lambda series: series.summary()["last_ms"]),
+    ("Decode Time p95", "decode", lambda series: series.percentile(0.95)),
+    ("Dispatch Time p95", "dispatch", lambda series: series.percentile(0.95)),
+    ("Write Latency p95", "write", lambda series: series.percentile(0.95)),
+)
+
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities
 ):
     coordinator = hass.data[DOMAIN][entry.entry_id]
     serial = entry.data.get("serial")
 
-    register_map = entry.data.get("register_map", [])
+    def create(config):
+        # Timestamp entries (type == "timestamp") are sensors too
+        if config["type"] == "timestamp":
+            return ModbusTimestampEntity(coordinator, config, serial, entry)
+        return ModbusSensorEntity(coordinator, config, serial, entry)
 
-    entities = [
-        ModbusSensorEntity(coordinator, config, serial, entry)
-        for config in register_map
-        if config["type"] == "sensor"
-    ]
-    # Add timestamp entities (type == "timestamp")
-    entities += [
-        ModbusTimestampEntity(coordinator, config, serial, entry)
-        for config in register_map
-        if config.get("type") == "timestamp"
-    ]
-    async_add_entities(entities, update_before_add=True)
+    coordinator.async_register_platform("sensor", async_add_entities, create)
+    async_add_entities(
+        [ModbusMetricSensor(coordinator, name, series, reader, serial) for name, series, reader in METRIC_SENSORS]
+        + [ModbusBytesSensor(coordinator, serial)]
+        + health_sensors(coordinator, serial)
+        + session_sensors(coordinator, serial)
+    )
 
 
-class ModbusSensorEntity(SensorEntity):
+class ModbusSensorEntity(ModbusValueEntity, SensorEntity):
     def __init__(self, coordinator, config, serial, config_entry: ConfigEntry | None = None):
+        super().__init__(coordinator, context=config["name"])
         self._register = config["register"]
         self.entity_type = "sensor"
         self.serial = serial
         self._attr_name = config["name"]
         self._attr_default_entity_id = f"givevc_{serial}_{slugify(self._attr_name)}"
         self._attr_unique_id = f"givevc_{serial}_{slugify(self._attr_name)}"
-        self.coordinator = coordinator
         self._config_entry = config_entry
-        self._scale = config.get("scale", 1.0)
         self._unit = config.get("unit", "")
-        self._float = config.get("float", False)
-        self._byte_order = config.get("byte_order", None)
         self._device_class = config.get("device_class")
-        self._lookup = config.get("lookup")
 
     @property
     def device_info(self):
@@ -88,46 +96,18 @@ class ModbusSensorEntity(SensorEntity):
         return self._device_class
     @property
     def native_value(self):
-        try:
-            data = self.coordinator.data
-            if self._float:
-                val = decode_float(
-                    data[self._register : self._register + 2], self._byte_order
-                )
-            elif self._byte_order:
-                # default assumption: two consecutive registers form an unsigned 32-bit value
-                val = decode_unsigned_32(
-                    data[self._register : self._register + 2], self._byte_order
-                )
-            else:
-                val = data[self._register]
-
-            # If a lookup mapping is provided, map the raw (unscaled) value to a state
-            if self._lookup:
-                try:
-                    key = str(int(val)) if isinstance(val, (int, float)) else str(val)
-                except (TypeError, ValueError):
-                    key = str(val)
-                mapped = self._lookup.get(key)
-                if mapped is not None:
-                    return mapped
-
-            return round(val * self._scale, 2)
-        except (IndexError, TypeError, KeyError):
-            return None
-
-
-class ModbusTimestampEntity(SensorEntity):
+        return self.coordinator.values.get(self._attr_name)
+
+
+class ModbusTimestampEntity(ModbusValueEntity, SensorEntity):
     """Timestamp sensor built from three registers: hour, minute, second."""
 
     def __init__(self, coordinator, config, serial, config_entry: ConfigEntry | None = None):
-        self.coordinator = coordinator
+        super().__init__(coordinator, context=config["name"])
         self.serial = serial
         self._attr_name = config.get("name")
         self._config_entry = config_entry
         self._register = config.get("register")
-        self._register_minute = config.get("register_minute")
-        self._register_second = config.get("register_second")
         self._attr_device_class = SensorDeviceClass.TIMESTAMP
         self._attr_default_entity_id = f"givevc_{serial}_{slugify(self._attr_name)}"
         self._attr_unique_id = f"givevc_{serial}_{slugify(self._attr_name)}"
@@ -160,30 +140,92 @@ class ModbusTimestampEntity(SensorEntity):
 
     @property
     def native_value(self):
-        try:
-            data = self.coordinator.data
-            hour = int(data[self._register])
-            minute = int(data[self._register_minute]) if self._register_minute is not None else 0
-            second = int(data[self._register_second]) if self._register_second is not None else 0
-
-            if not (0 <= hour <= 23 and 0 <= minute <= 59 and 0 <= second <= 59):
-                return None
-
-            tz = dt_util.DEFAULT_TIME_ZONE
-            now_local = dt_util.now().astimezone(tz)
-            dt_val = datetime(
-                year=now_local.year,
-                month=now_local.month,
-                day=now_local.day,
-                hour=hour,
-                minute=minute,
-                second=second,
-                tzinfo=tz,
-            )
-            return dt_val
-        except (IndexError, TypeError, KeyError):
-            return None
-
-    async def async_update(self):
-        await self.coordinator.async_request_refresh()
+        return self.coordinator.values.get(self._attr_name)
+
+
+class ModbusMetricSensor(CoordinatorEntity, SensorEntity):
+    """A timing figure from the coordinator's poll metrics, in milliseconds.
+
+    Disabled by default; the full window summary is in the attributes.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
 
+    def __init__(self, coordinator, name, series, reader, serial):
+        super().__init__(coordinator)
+        self.serial = serial
+        self._series = series
+        self._reader = reader
+        self._attr_name = name
+        self._attr_unique_id = f"givevc_{serial}_{slugify(name)}"
+
+    @property
+    def device_info(self):
+        return {
+            "identifiers": {(f"givevc_{self.serial}")},
+            "name": "GivEVC",
+            "manufacturer": "GivEnergy",
+            "model": "GivEVC",
+            "serial_number": self.serial,
+        }
+
+    @property
+    def available(self):
+        # Timings are still meaningful while the charger is unreachable
+        return True
+
+    @property
+    def native_value(self):
+        return self._reader(getattr(self.coordinator.metrics, self._series))
+
+    @property
+    def extra_state_attributes(self):
+        return getattr(self.coordinator.metrics, self._series).summary()
+
+
+class ModbusBytesSensor(CoordinatorEntity, SensorEntity):
+    """Modbus TCP bytes exchanged with the charger since setup."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_device_class = SensorDeviceClass.DATA_SIZE
+    _attr_native_unit_of_measurement = UnitOfInformation.BYTES
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_name = "Bytes Transferred"
+
+    def __init__(self, coordinator, serial):
+        super().__init__(coordinator)
+        self.serial = serial
+        self._attr_unique_id = f"givevc_{serial}_bytes_transferred"
+
+    @property
+    def device_info(self):
+        return {
+            "identifiers": {(f"givevc_{self.serial}")},
+            "name": "GivEVC",
+            "manufacturer": "GivEnergy",
+            "model": "GivEVC",
+            "serial_number": self.serial,
+        }
+
+    @property
+    def available(self):
+        return True
+
+    @property
+    def native_value(self):
+        return self.coordinator.metrics.bytes_transferred
+
+    @property
+    def extra_state_attributes(self):
+        metrics = self.coordinator.metrics
+        return {
+            "bytes_read": metrics.bytes_read,
+            "bytes_written": metrics.bytes_written,
+            "read_errors": metrics.read_errors,
+            "write_errors": metrics.write_errors,
+        }
@@ -0,0 +1,117 @@
+import logging
+import os
+import time
+
+import voluptuous as vol
+from homeassistant.core import SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    HISTORY_EXPORT_DIR,
+    SERVICE_EXPORT_HISTORY,
+    SERVICE_RELOAD_REGISTER_MAP,
+)
+from .history import write_csv
+from .register_map import async_load_register_map
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _as_timestamp(value):
+    """Epoch seconds for a service datetime.
+
+    ``cv.datetime`` gives naive datetimes for times entered without an
+    offset; those are in Home Assistant's configured time zone, not the
+    system's.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return dt_util.as_utc(value).timestamp()
+
+EXPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional("config_entry_id"): cv.string,
+        vol.Optional("start"): cv.datetime,
+        vol.Optional("end"): cv.datetime,
+        vol.Optional("bucket", default=0): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    }
+)
+
+
+@callback
+def async_setup_services(hass):
+    """Register the integration's services once, for every config entry."""
+    if hass.services.has_service(DOMAIN, SERVICE_RELOAD_REGISTER_MAP):
+        return
+
+    async def async_reload_register_map(call):
+        register_map = await async_load_register_map(hass)
+        if not register_map.entries:
+            _LOGGER.error("register_map.json has no valid entries; keeping the current map")
+            return
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            coordinator = hass.data[DOMAIN].get(entry.entry_id)
+            if coordinator is None or coordinator.register_map.digest == register_map.digest:
+                continue
+            added, removed, changed = await coordinator.async_reload_register_map(register_map)
+            _LOGGER.info(
+                "Reloaded the register map of %s: %d added, %d removed, %d changed",
+                entry.title,
+                len(added),
+                len(removed),
+                len(changed),
+            )
+            hass.config_entries.async_update_entry(
+                entry, data={**entry.data, "register_map_version": register_map.digest}
+            )
+
+    hass.services.async_register(DOMAIN, SERVICE_RELOAD_REGISTER_MAP, async_reload_register_map)
+
+    async def async_export_history(call):
+        """Write each charger's recorded history window to a .csv.gz file."""
+        end = _as_timestamp(call.data["end"]) if "end" in call.data else time.time()
+        start = _as_timestamp(call.data["start"]) if "start" in call.data else end - 3600
+        entries = [
+            entry for entry in hass.config_entries.async_entries(DOMAIN)
+            if entry.entry_id in hass.data[DOMAIN]
+            and call.data.get("config_entry_id", entry.entry_id) == entry.entry_id
+        ]
+        if not entries:
+            raise HomeAssistantError("No loaded GivEVC charger matches the request")
+        directory = hass.config.path(HISTORY_EXPORT_DIR)
+        await hass.async_add_executor_job(lambda: os.makedirs(directory, exist_ok=True))
+        files = []
+        for entry in entries:
+            coordinator = hass.data[DOMAIN][entry.entry_id]
+            stamp = dt_util.utc_from_timestamp(start).strftime("%Y%m%dT%H%M%SZ")
+            path = os.path.join(directory, f"{coordinator.serial or entry.entry_id}_{stamp}.csv.gz")
+            # Copy the ring in the event loop; polls keep appending to it
+            rows = await hass.async_add_executor_job(
+                write_csv, path, coordinator.history.snapshot(), start, end, call.data["bucket"]
+            )
+            _LOGGER.info("Exported %d history rows for %s to %s", rows, entry.title, path)
+            files.append({"config_entry_id": entry.entry_id, "path": path, "rows": rows})
+        return {"files": files}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_HISTORY,
+        async_export_history,
+        schema=EXPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+@callback
+def async_unload_services(hass):
+    """Remove the services once the last config entry is unloaded."""
+    if any(
+        entry.entry_id in hass.data.get(DOMAIN, {})
+        for entry in hass.config_entries.async_entries(DOMAIN)
+    ):
+        return
+    hass.services.async_remove(DOMAIN, SERVICE_RELOAD_REGISTER_MAP)
+    hass.services.async_remove(DOMAIN, SERVICE_EXPORT_HISTORY)
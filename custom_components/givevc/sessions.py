@@ -0,0 +1,257 @@
+import logging
+from collections import deque
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN, UnitOfEnergy
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import (
+    ADAPTIVE_IDLE_STATES,
+    CONF_TARIFF,
+    CONF_TARIFF_ENTITY,
+    DEFAULT_TARIFF,
+    DOMAIN,
+    SESSION_LOG_SIZE,
+    SESSION_MAX_POWER_KW,
+    SESSION_SAVE_DELAY,
+    SESSION_STORAGE_VERSION,
+    SIGNAL_SESSION,
+)
+from .storage import ThrottledStore
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SessionTracker:
+    """Running energy and cost totals for charging sessions.
+
+    A session starts when the charging state leaves the idle states and
+    ends when it returns to them. Every poll folds the meter's step since
+    the last one into the open session, costed at the tariff in force, so
+    totals never need the recorder. Finished sessions go into a short log,
+    which is kept in storage with the open session and lifetime totals.
+    """
+
+    def __init__(self, hass, entry_id, options):
+        self.hass = hass
+        self.tariff = float(options.get(CONF_TARIFF, DEFAULT_TARIFF))
+        self.tariff_entity = options.get(CONF_TARIFF_ENTITY)
+        self._store = ThrottledStore(hass, SESSION_STORAGE_VERSION, f"{DOMAIN}.sessions.{entry_id}")
+        # Sessions are dicts of start/end (epoch seconds), energy_kwh, cost
+        # and peak_power_w
+        self.current = None
+        self.log = deque(maxlen=SESSION_LOG_SIZE)
+        self.totals = {"sessions": 0, "energy_kwh": 0.0, "cost": 0.0}
+        # The last meter reading (kWh) and when it was taken (epoch
+        # seconds), to take each poll's step from
+        self._meter = None
+        self._meter_time = None
+
+    @property
+    def last(self):
+        return self.log[-1] if self.log else None
+
+    async def async_load(self):
+        data = await self._store.async_load() or {}
+        self.current = data.get("current")
+        self.log.extend(data.get("log", []))
+        self.totals.update(data.get("totals", {}))
+        self._meter = data.get("meter")
+        self._meter_time = data.get("meter_time")
+
+    def _data_to_save(self):
+        return {
+            "current": self.current,
+            "log": list(self.log),
+            "totals": self.totals,
+            "meter": self._meter,
+            "meter_time": self._meter_time,
+        }
+
+    @callback
+    def _async_schedule_save(self):
+        self._store.async_throttled_save(self._data_to_save, SESSION_SAVE_DELAY)
+
+    async def async_save(self):
+        await self._store.async_save(self._data_to_save())
+
+    def price(self):
+        """The tariff per kWh right now, from the tariff sensor if it has one."""
+        if self.tariff_entity:
+            state = self.hass.states.get(self.tariff_entity)
+            if state is not None and state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+                try:
+                    return float(state.state)
+                except ValueError:
+                    pass
+        return self.tariff
+
+    @callback
+    def async_update(self, charging_state, meter, power, now):
+        """Fold one poll into the totals; returns True if a session changed.
+
+        ``meter`` is the meter reading in kWh and ``power`` the active power
+        in W; either may be None. A missing charging state neither starts
+        nor ends a session, and leaves the meter step for a later poll that
+        can attribute it.
+        """
+        if charging_state is None:
+            return False
+        step = self._meter_step(meter, now)
+        active = charging_state not in ADAPTIVE_IDLE_STATES
+        changed = False
+        if active and self.current is None:
+            # Energy metered before the car was plugged in is not the session's
+            self.current = {"start": now, "end": None, "energy_kwh": 0.0, "cost": 0.0, "peak_power_w": 0}
+            step = 0.0
+            changed = True
+        session = self.current
+        if session is not None:
+            if step:
+                session["energy_kwh"] += step
+                session["cost"] += step * self.price()
+                changed = True
+            if power is not None and power > session["peak_power_w"]:
+                session["peak_power_w"] = power
+                changed = True
+            if not active:
+                session["end"] = now
+                self.log.append(session)
+                self.current = None
+                self.totals["sessions"] += 1
+                self.totals["energy_kwh"] += session["energy_kwh"]
+                self.totals["cost"] += session["cost"]
+                changed = True
+        if changed:
+            self._async_schedule_save()
+        return changed
+
+    def _meter_step(self, meter, now):
+        """The meter's rise since the last reading, which becomes the baseline.
+
+        Steps the charger could not have delivered in the time since the
+        last reading (a meter reset or a bad read) are logged and dropped.
+        """
+        if meter is None:
+            return 0.0
+        previous, previous_time = self._meter, self._meter_time
+        self._meter, self._meter_time = meter, now
+        if previous is None:
+            return 0.0
+        step = meter - previous
+        hours = None if previous_time is None else max(0.0, now - previous_time) / 3600
+        if step < 0 or (hours is not None and step > SESSION_MAX_POWER_KW * hours):
+            _LOGGER.warning(
+                "Discarding a meter step of %.2f kWh over %.2f h (from %.2f to %.2f kWh)",
+                step, hours or 0.0, previous, meter,
+            )
+            return 0.0
+        return step
+
+    def as_dict(self):
+        return {
+            "current": session_summary(self.current),
+            "last": session_summary(self.last),
+            "totals": {key: round(value, 3) for key, value in self.totals.items()},
+            "logged": len(self.log),
+        }
+
+
+def session_summary(session, now=None):
+    """A session's figures for display, with its duration and mean power."""
+    if session is None:
+        return None
+    end = session["end"] if session["end"] is not None else (now or dt_util.utcnow().timestamp())
+    duration = max(0.0, end - session["start"])
+    return {
+        "start": dt_util.utc_from_timestamp(session["start"]).isoformat(),
+        "end": dt_util.utc_from_timestamp(session["end"]).isoformat() if session["end"] is not None else None,
+        "duration_s": round(duration),
+        "energy_kwh": round(session["energy_kwh"], 3),
+        "cost": round(session["cost"], 2),
+        "mean_power_w": round(session["energy_kwh"] * 3.6e6 / duration) if duration else None,
+        "peak_power_w": session["peak_power_w"],
+    }
+
+
+# Session sensors: (name, "current" or "last" session, key in the session)
+SESSION_SENSORS = (
+    ("Current Session Energy", "current", "energy_kwh"),
+    ("Current Session Cost", "current", "cost"),
+    ("Last Session Energy", "last", "energy_kwh"),
+    ("Last Session Cost", "last", "cost"),
+)
+
+
+class ModbusSessionSensor(SensorEntity):
+    """A figure from the current or last session, updated as it changes."""
+
+    _attr_should_poll = False
+
+    def __init__(self, coordinator, serial, name, which, key):
+        self.coordinator = coordinator
+        self.serial = serial
+        self._which = which
+        self._key = key
+        self._attr_name = name
+        self._attr_unique_id = f"givevc_{serial}_{slugify(name)}"
+        if key == "energy_kwh":
+            self._attr_device_class = SensorDeviceClass.ENERGY
+            self._attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+            self._attr_suggested_display_precision = 2
+        else:
+            self._attr_device_class = SensorDeviceClass.MONETARY
+            self._attr_suggested_display_precision = 2
+        # The current session's figures start again from zero each session;
+        # last_reset tells long-term statistics so they are not read as a drop
+        if which == "current":
+            self._attr_state_class = SensorStateClass.TOTAL
+
+    @property
+    def device_info(self):
+        return {
+            "identifiers": {(f"givevc_{self.serial}")},
+            "name": "GivEVC",
+            "manufacturer": "GivEnergy",
+            "model": "GivEVC",
+            "serial_number": self.serial,
+        }
+
+    @property
+    def native_unit_of_measurement(self):
+        if self._key == "cost":
+            return self.hass.config.currency
+        return self._attr_native_unit_of_measurement
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self._apply_session()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_SESSION.format(self.coordinator.entry.entry_id),
+                self._async_session_updated,
+            )
+        )
+
+    @callback
+    def _async_session_updated(self):
+        self._apply_session()
+        self.async_write_ha_state()
+
+    def _apply_session(self):
+        tracker = self.coordinator.sessions
+        session = tracker.current if self._which == "current" else tracker.last
+        summary = session_summary(session)
+        if self._which == "current" and session is not None:
+            self._attr_last_reset = dt_util.utc_from_timestamp(session["start"])
+        self._attr_native_value = summary[self._key] if summary is not None else None
+        self._attr_extra_state_attributes = summary
+
+
+def session_sensors(coordinator, serial):
+    return [
+        ModbusSessionSensor(coordinator, serial, *description) for description in SESSION_SENSORS
+    ]
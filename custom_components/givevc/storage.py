@@ -0,0 +1,34 @@
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+
+
+class ThrottledStore(Store):
+    """A Store for data that changes on every poll.
+
+    ``Store.async_delay_save`` pushes a pending save back each time it is
+    called, so data that keeps changing would never be written. Here only
+    one delayed save is scheduled at a time and later changes ride along
+    with it; like any delayed save it is flushed when Home Assistant stops.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._save_pending = False
+
+    @callback
+    def async_throttled_save(self, data_func, delay):
+        """Save ``data_func()`` within ``delay`` seconds, unless already due to."""
+        if self._save_pending:
+            return
+        self._save_pending = True
+
+        def data():
+            self._save_pending = False
+            return data_func()
+
+        self.async_delay_save(data, delay)
+
+    async def async_save(self, data):
+        # Saving now replaces any pending delayed save
+        self._save_pending = False
+        await super().async_save(data)
@@ -2,26 +2,24 @@ from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.util import slugify
-from homeassistant.helpers import entity_registry as er
 
 from .const import DOMAIN
+from .entity import ModbusValueEntity
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
     coordinator = hass.data[DOMAIN][entry.entry_id]
     serial = entry.data.get("serial")
-    register_map = entry.data.get("register_map", [])
+    coordinator.async_register_platform(
+        "switch",
+        async_add_entities,
+        lambda config: ModbusSwitchEntity(coordinator, config, serial),
+    )
 
-    entities = [
-        ModbusSwitchEntity(coordinator, config, serial)
-        for config in register_map if config["type"] == "switch"
-    ]
-    async_add_entities(entities)
 
-
-class ModbusSwitchEntity(SwitchEntity):
+class ModbusSwitchEntity(ModbusValueEntity, SwitchEntity):
     def __init__(self, coordinator, config, serial):
-        self.coordinator = coordinator
+        super().__init__(coordinator, context=config["name"])
         self.serial = serial
         self._attr_name = config["name"]
         self._attr_default_entity_id = f"givevc_{serial}_{slugify(self._attr_name)}"
@@ -42,38 +40,15 @@ class ModbusSwitchEntity(SwitchEntity):
             "serial_number": self.serial,
         }
 
-    async def async_added_to_hass(self) -> None:
-        await super().async_added_to_hass()
-        registry = er.async_get(self.hass)
-        #suggested_object_id = f"givvc_{self.serial}_{slugify(self._attr_name)}"
-        registry.async_get_or_create(
-            domain="sensor",
-            platform=DOMAIN,
-            unique_id=self._attr_default_entity_id,
-            suggested_object_id=self._attr_default_entity_id,
-            config_entry=self._config_entry,
-        )
-
-
     @property
     def is_on(self):
-        try:
-            val = self.coordinator.data[self._register]
-            return not bool(val) if self._invert else bool(val)
-        except Exception:
-            return False
+        # Decoded against write_on, write_off and invert
+        return self.coordinator.value(self._attr_name)
 
     async def async_turn_on(self, **kwargs):
         value = self._write_off if self._invert else self._write_on
-        client = self.coordinator.client
-        unit_id = self.coordinator.unit_id
-        await self.hass.async_add_executor_job(client.write_register, self._register, value, unit_id)
+        await self.coordinator.async_write_entity(self._attr_name, self._register, [value], True)
 
     async def async_turn_off(self, **kwargs):
         value = self._write_on if self._invert else self._write_off
-        client = self.coordinator.client
-        unit_id = self.coordinator.unit_id
-        await self.hass.async_add_executor_job(client.write_register, self._register, value, unit_id)
-
-    async def async_update(self):
-        await self.coordinator.async_request_refresh()
\ No newline at end of file
+        await self.coordinator.async_write_entity(self._attr_name, self._register, [value], False)
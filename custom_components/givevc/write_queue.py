@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import time
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .metrics import read_bytes
+
+_LOGGER = logging.getLogger(__name__)
+
+# Largest register count accepted by one write (function code 16)
+MODBUS_MAX_WRITE = 123
+
+
+def contiguous_runs(registers, max_count=MODBUS_MAX_WRITE):
+    """Group an ``{address: value}`` dict into ``(start, [values])`` runs."""
+    runs = []
+    for address in sorted(registers):
+        if runs and address == runs[-1][0] + len(runs[-1][1]) and len(runs[-1][1]) < max_count:
+            runs[-1][1].append(registers[address])
+        else:
+            runs.append((address, [registers[address]]))
+    return runs
+
+
+class WriteQueue:
+    """Serialises register writes for one charger and coalesces bursts.
+
+    Writes made while an earlier batch is waiting for the bus are merged into
+    the next batch, with the latest value winning for each register.
+    Contiguous registers go out in one ``write_registers`` call under the
+    coordinator's I/O lock, so writes never interleave with a poll, and only
+    the written registers are read back afterwards.
+    """
+
+    def __init__(self, coordinator):
+        self._coordinator = coordinator
+        self._pending = {}
+        self._waiters = []
+        # Waiters of the batch on the bus right now
+        self._writing = []
+        self._task = None
+
+    async def async_write(self, address, values):
+        """Queue ``values`` for ``address`` onwards and wait until written.
+
+        Returns the registers read back from the charger as an
+        ``{address: value}`` dict; raises if the write failed.
+        """
+        for offset, value in enumerate(values):
+            self._pending[address + offset] = int(value) & 0xFFFF
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        if self._task is None or self._task.done():
+            self._task = self._coordinator.hass.async_create_task(self._async_flush())
+        started = time.perf_counter()
+        result = await waiter
+        self._coordinator.metrics.write.add(time.perf_counter() - started)
+        return result
+
+    async def _async_flush(self):
+        coordinator = self._coordinator
+        metrics = coordinator.metrics
+        while self._pending:
+            async with coordinator.io_lock:
+                # Take the batch only once the bus is ours, so writes queued
+                # while a poll was running are coalesced into it.
+                pending, self._pending = self._pending, {}
+                waiters, self._waiters = self._waiters, []
+                self._writing = waiters
+                try:
+                    readback = {}
+                    for start, values in contiguous_runs(pending):
+                        result = await coordinator.connection.write_registers(start, values)
+                        if result.isError():
+                            raise ConnectionError(f"Modbus write of {len(values)} registers at {start} failed")
+                        metrics.record_write(len(values))
+                    for start, values in contiguous_runs(pending):
+                        result = await coordinator.connection.read_holding_registers(start, count=len(values))
+                        if result.isError():
+                            raise ConnectionError(f"Modbus read back at {start} failed")
+                        readback.update(zip(range(start, start + len(values)), result.registers))
+                        metrics.bytes_read += read_bytes(len(values))
+                except Exception as err:
+                    metrics.write_errors += 1
+                    _LOGGER.warning("Modbus write to %s failed: %s", coordinator.host, err)
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_exception(err)
+                    continue
+                finally:
+                    self._writing = []
+            coordinator.async_apply_registers(readback)
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(readback)
+
+    def cancel(self):
+        """Drop queued writes and fail every waiter.
+
+        That includes the batch being written, whose read-back will never
+        come once the flush task is cancelled.
+        """
+        if self._task is not None:
+            self._task.cancel()
+        for waiter in self._writing + self._waiters:
+            if not waiter.done():
+                waiter.set_exception(HomeAssistantError("The charger was unloaded before the write finished"))
+        self._pending, self._waiters, self._writing = {}, [], []
@@ -0,0 +1,99 @@
+"""Fixtures for the GivEVC tests."""
+
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+import pytest
+from homeassistant.config_entries import ConfigEntryState
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.givevc import coordinator as coordinator_module
+from custom_components.givevc.connection import ModbusConnection
+from custom_components.givevc.const import DOMAIN
+from custom_components.givevc.register_map import compile_map
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+from simulator import ChargerSimulator  # noqa: E402
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+# One of every kind of entry the decoder handles, some kept in history
+REGISTER_MAP = [
+    {"name": "State", "type": "sensor", "register": 0, "lookup": {"1": "idle", "4": "charging"}},
+    {"name": "Current", "type": "sensor", "register": 1, "scale": 0.1, "history": True},
+    {"name": "Offset", "type": "sensor", "register": 2, "signed": True, "history": True},
+    {"name": "Energy", "type": "sensor", "register": 3, "byte_order": "CDAB", "scale": 0.1, "history": True},
+    {"name": "Power", "type": "sensor", "register": 5, "float": True, "byte_order": "ABCD"},
+    {"name": "Limit", "type": "number", "register": 7, "scale": 0.1},
+    {"name": "Mode", "type": "select", "register": 8, "lookup": {"0": "Eco", "1": "Boost"}},
+    {"name": "Enabled", "type": "switch", "register": 9},
+    {"name": "Locked", "type": "switch", "register": 10, "invert": True},
+    {"name": "Start", "type": "timestamp", "register": 11, "register_minute": 12, "register_second": 13},
+    {"name": "Swapped", "type": "sensor", "register": 14, "byte_order": "DCBA", "history": True},
+    {"name": "Far", "type": "sensor", "register": 40},
+]
+
+
+@pytest.fixture
+def register_map():
+    """``REGISTER_MAP`` compiled."""
+    return compile_map(REGISTER_MAP)
+
+
+@pytest.fixture
+def image():
+    """A register image for ``register_map``.
+
+    State is charging, Current 12.3 A, Offset -1, Energy 6555.2 (CDAB),
+    Power 7.5 (float), Limit 16.0, Mode Boost, both switches on (so Locked
+    reads off), Start 13:30:05 and Swapped 0x00010002 (DCBA); Far is
+    outside the image.
+    """
+    power = struct.unpack(">2H", struct.pack(">f", 7.5))
+    return array("H", [4, 123, 0xFFFF, 0x0010, 0x0001, *power, 160, 1, 1, 1, 13, 30, 5, 0x0200, 0x0100])
+
+
+@pytest.fixture
+async def simulator(socket_enabled):
+    """A simulated charger on a free loopback port."""
+    async with ChargerSimulator(port=0) as simulator:
+        yield simulator
+
+
+@pytest.fixture
+def config_entry(hass, simulator, enable_custom_integrations, monkeypatch):
+    """A config entry for the simulated charger, not yet set up.
+
+    The integration always connects on port 502, so coordinators are pointed
+    at the simulator's port instead.
+    """
+    monkeypatch.setattr(
+        coordinator_module,
+        "ModbusConnection",
+        lambda host, port, **kwargs: ModbusConnection(host, simulator.port, **kwargs),
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"host": simulator.host, "scan_interval": 30, "serial": simulator.serial},
+        unique_id=simulator.serial,
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture
+async def setup_entry(hass, config_entry):
+    """Set up ``config_entry``, unloading it again after the test."""
+
+    async def setup():
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+        return hass.data[DOMAIN][config_entry.entry_id]
+
+    yield setup
+    if config_entry.state is ConfigEntryState.LOADED:
+        await hass.config_entries.async_unload(config_entry.entry_id)
+        await hass.async_block_till_done()
@@ -0,0 +1,51 @@
+"""Tests for adaptive polling."""
+
+import time
+
+from custom_components.givevc.const import CONF_ADAPTIVE, CONF_MAX_INTERVAL, CONF_MIN_INTERVAL
+
+
+async def _refresh(coordinator):
+    coordinator._next_read = dict.fromkeys(coordinator._next_read, 0.0)
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+
+
+async def test_idle_charger_backs_off_until_a_car_connects(hass, simulator, config_entry, setup_entry):
+    hass.config_entries.async_update_entry(
+        config_entry, options={CONF_ADAPTIVE: True, CONF_MIN_INTERVAL: 5, CONF_MAX_INTERVAL: 20}
+    )
+    coordinator = await setup_entry()
+    assert coordinator.adaptive_interval == 5
+    assert coordinator.charging_active is False
+
+    # Nothing live changes while idle, so the live tiers slow down to the maximum
+    intervals = []
+    for _ in range(5):
+        await _refresh(coordinator)
+        intervals.append(coordinator.adaptive_interval)
+    assert intervals == [7.5, 11.25, 16.875, 20, 20]
+    assert coordinator._block_interval(30) == 20
+    assert coordinator._block_interval(300) == 300
+
+    # A live value changing steps back towards the minimum
+    simulator.registers[13] += 100
+    await _refresh(coordinator)
+    assert coordinator.adaptive_interval == 20 / 1.5
+
+    # A car connecting goes straight to the minimum, with the live blocks due now
+    simulator.registers[0] = 2
+    await _refresh(coordinator)
+    assert coordinator.charging_active is True
+    assert coordinator.adaptive_interval == 5
+    now = time.monotonic()
+    live = [block for block in coordinator.blocks if block[2] is not None and block[2] <= 30]
+    assert all(coordinator._next_read[block] <= now for block in live)
+
+
+async def test_fixed_interval_without_adaptive(simulator, setup_entry):
+    coordinator = await setup_entry()
+    for _ in range(3):
+        await _refresh(coordinator)
+    assert coordinator.adaptive_interval == 5
+    assert coordinator._block_interval(30) == 30
@@ -0,0 +1,123 @@
+"""Tests for the shared Modbus connection."""
+
+import asyncio
+import socket
+import time
+
+import pytest
+
+from custom_components.givevc import connection as connection_module
+from custom_components.givevc.connection import BACKOFF_MIN, ModbusConnection
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def test_one_socket_for_every_request(simulator):
+    connection = ModbusConnection(simulator.host, simulator.port)
+    for _ in range(3):
+        result = await connection.read_holding_registers(0, 4)
+        assert result.registers == simulator.registers[0:4]
+    await connection.write_registers(91, [200])
+    assert simulator.registers[91] == 200
+    assert simulator.connections == 1
+    assert connection.connected
+    await connection.close()
+
+
+async def test_reconnect_backs_off(socket_enabled):
+    connection = ModbusConnection("127.0.0.1", _free_port(), timeout=1)
+    with pytest.raises(ConnectionError, match="failed to connect"):
+        await connection.read_holding_registers(0, 1)
+    assert BACKOFF_MIN - 0.1 < connection.retry_after <= BACKOFF_MIN
+    # Within the backoff nothing is attempted
+    with pytest.raises(ConnectionError, match="backing off"):
+        await connection.read_holding_registers(0, 1)
+    await connection.close()
+
+
+async def test_new_host_clears_the_backoff(simulator):
+    connection = ModbusConnection("127.0.0.1", simulator.port, timeout=1)
+    connection.port = _free_port()
+    with pytest.raises(ConnectionError):
+        await connection.read_holding_registers(0, 1)
+    connection.port = simulator.port
+    await connection.async_set_host(simulator.host)
+    assert connection.retry_after == 0
+    assert (await connection.read_holding_registers(0, 1)).registers == simulator.registers[0:1]
+    await connection.close()
+
+
+async def test_closed_socket_is_replaced(simulator):
+    connection = ModbusConnection(simulator.host, simulator.port)
+    await connection.read_holding_registers(0, 1)
+    # The charger drops every connection, e.g. after a restart
+    await simulator.stop()
+    await simulator.start()
+    assert (await connection.read_holding_registers(0, 1)).registers == simulator.registers[0:1]
+    assert simulator.connections == 2
+    await connection.close()
+
+
+async def test_idle_socket_is_probed(simulator, monkeypatch):
+    monkeypatch.setattr(connection_module, "IDLE_PROBE_AFTER", -1)
+    connection = ModbusConnection(simulator.host, simulator.port)
+    await connection.read_holding_registers(0, 1)
+    await connection.read_holding_registers(0, 1)
+    assert simulator.requests == 3
+    assert simulator.connections == 1
+    await connection.close()
+
+
+async def test_failed_request_drops_the_socket(simulator):
+    connection = ModbusConnection(simulator.host, simulator.port, timeout=0.5)
+    await connection.read_holding_registers(0, 1)
+    simulator.drop_rate = 1.0
+    with pytest.raises(Exception):
+        await connection.read_holding_registers(0, 1)
+    assert not connection.connected
+    assert connection.retry_after > 0
+    await connection.close()
+
+
+async def test_closed_connection_refuses_requests(simulator):
+    connection = ModbusConnection(simulator.host, simulator.port)
+    await connection.close()
+    with pytest.raises(ConnectionError, match="closed"):
+        await connection.read_holding_registers(0, 1)
+
+
+async def test_connect_counts_against_the_request_timeout(monkeypatch):
+    class HangingClient:
+        connected = False
+
+        def __init__(self, **kwargs):
+            pass
+
+        async def connect(self):
+            await asyncio.sleep(10)
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(connection_module, "AsyncModbusTcpClient", HangingClient)
+    connection = ModbusConnection("127.0.0.1", timeout=5)
+    started = time.monotonic()
+    with pytest.raises(ConnectionError, match="failed to connect"):
+        await connection.read_holding_registers(0, 1, timeout=0.2)
+    assert time.monotonic() - started < 1
+
+
+async def test_slow_probe_leaves_time_for_the_request(simulator, monkeypatch):
+    monkeypatch.setattr(connection_module, "IDLE_PROBE_AFTER", -1)
+    connection = ModbusConnection(simulator.host, simulator.port)
+    await connection.read_holding_registers(0, 1)
+    simulator.latency = 0.3
+    started = time.monotonic()
+    with pytest.raises(Exception):
+        await connection.read_holding_registers(0, 1, timeout=0.5)
+    assert time.monotonic() - started < 0.8
+    await connection.close()
@@ -0,0 +1,86 @@
+"""Tests for the register map decoder."""
+
+import homeassistant.util.dt as dt_util
+
+from custom_components.givevc.decoder import DecodePlan, value_type
+from custom_components.givevc.number import ModbusNumberEntity
+from custom_components.givevc.register_map import compile_map
+
+
+def test_value_type():
+    assert value_type({}) == "u16"
+    assert value_type({"signed": True}) == "s16"
+    assert value_type({"byte_order": "ABCD"}) == "u32"
+    assert value_type({"byte_order": "ABCD", "signed": True}) == "s32"
+    assert value_type({"float": True, "signed": True}) == "float32"
+    # Two-register numbers are written signed, so they read back signed
+    assert value_type({"type": "number", "byte_order": "CDAB"}) == "s32"
+    assert value_type({"type": "number", "byte_order": "CDAB", "signed": False}) == "u32"
+    assert value_type({"type": "number"}) == "u16"
+
+
+def test_decode(register_map, image):
+    values = DecodePlan(register_map).decode(image)
+    start = values.pop("Start")
+    assert values == {
+        "State": "charging",
+        "Current": 12.3,
+        "Offset": -1,
+        "Energy": 6555.2,
+        "Power": 7.5,
+        "Limit": 16.0,
+        "Mode": "Boost",
+        "Enabled": True,
+        "Locked": False,
+        "Swapped": 65538,
+        "Far": None,
+    }
+    assert (start.hour, start.minute, start.second) == (13, 30, 5)
+    assert start.date() == dt_util.now().date()
+
+
+def test_lookup_miss_falls_back_to_the_scaled_value(register_map, image):
+    image[0] = 9
+    assert DecodePlan(register_map).decode(image)["State"] == 9
+
+
+def test_switch_values():
+    plan = DecodePlan(
+        compile_map([{"name": "Charge", "type": "switch", "register": 0, "write_on": 2, "write_off": 1}])
+    )
+    assert plan.decode([2]) == {"Charge": True}
+    assert plan.decode([1]) == {"Charge": False}
+    assert plan.decode([0]) == {"Charge": False}
+
+
+def test_invalid_timestamp_is_none(register_map, image):
+    image[12] = 61
+    assert DecodePlan(register_map).decode(image)["Start"] is None
+
+
+class _WriteCoordinator:
+    """Records what a number entity writes."""
+
+    def __init__(self):
+        self.written = {}
+
+    async def async_write_entity(self, name, register, registers, value):
+        self.written[name] = (register, list(registers))
+
+
+async def test_number_writes_read_back():
+    register_map = compile_map(
+        [
+            {"name": "Offset", "type": "number", "register": 0, "byte_order": "CDAB", "scale": 0.1, "min": -100},
+            {"name": "Target", "type": "number", "register": 2, "float": True, "byte_order": "BADC", "scale": 0.5},
+            {"name": "Limit", "type": "number", "register": 4, "scale": 0.1},
+        ]
+    )
+    coordinator = _WriteCoordinator()
+    image = [0] * 5
+    for config, value in zip(register_map, (-12.5, 7.0, 16.0)):
+        entity = ModbusNumberEntity(coordinator, config, "SERIAL")
+        await entity.async_set_native_value(value)
+        register, registers = coordinator.written[config["name"]]
+        image[register:register + len(registers)] = registers
+    assert DecodePlan(register_map).decode(image) == {"Offset": -12.5, "Target": 7.0, "Limit": 16.0}
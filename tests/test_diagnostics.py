@@ -0,0 +1,26 @@
+"""Tests for the config entry diagnostics."""
+
+import json
+
+from custom_components.givevc import coordinator as coordinator_module
+from custom_components.givevc.diagnostics import async_get_config_entry_diagnostics
+
+
+async def test_dump_does_not_name_the_charger(hass, simulator, config_entry, setup_entry, monkeypatch):
+    monkeypatch.setattr(coordinator_module, "POLL_TIMEOUT_BUDGET", 0.5)
+    coordinator = await setup_entry()
+    await simulator.stop()
+    coordinator._next_read = dict.fromkeys(coordinator._next_read, 0.0)
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    # An error from below the integration that names the host
+    coordinator.last_error = f"Connection to ({simulator.host}, {simulator.port}) failed"
+    coordinator.metrics.record_poll(False, 0.1, 0, coordinator.last_error)
+
+    dump = await async_get_config_entry_diagnostics(hass, config_entry)
+    text = json.dumps(dump, default=str)
+    assert simulator.host not in text
+    assert simulator.serial not in text
+    assert dump["health"]["last_error"] == f"Connection to (**REDACTED**, {simulator.port}) failed"
+    assert dump["metrics"]["history"][-1]["error"] == dump["health"]["last_error"]
+    assert dump["blocks"] == coordinator.blocks
@@ -0,0 +1,95 @@
+"""Tests for the discovery cache and rediscovery."""
+
+from datetime import timedelta
+
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.givevc import coordinator as coordinator_module
+from custom_components.givevc import discovery
+from custom_components.givevc.const import DATA_DISCOVERY, DOMAIN
+from custom_components.givevc.discovery import (
+    SAVE_DELAY,
+    STORAGE_KEY,
+    DiscoveryCache,
+    async_get_discovery_cache,
+)
+
+
+async def test_cache_is_shared_outside_the_coordinators(hass):
+    cache = await async_get_discovery_cache(hass)
+    assert await async_get_discovery_cache(hass) is cache
+    assert hass.data[DATA_DISCOVERY] is cache
+    assert DOMAIN not in hass.data
+
+
+async def test_seen_chargers_are_saved(hass, hass_storage):
+    cache = DiscoveryCache(hass)
+    await cache.async_load()
+    cache.seen("EV1", "10.0.0.5")
+    cache.seen(None, "10.0.0.6")
+    assert cache.chargers() == [{"serial": "EV1", "host": "10.0.0.5"}]
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=SAVE_DELAY + 1))
+    await hass.async_block_till_done()
+    assert hass_storage[STORAGE_KEY]["data"]["chargers"]["EV1"]["host"] == "10.0.0.5"
+
+    restored = DiscoveryCache(hass)
+    await restored.async_load()
+    assert restored.get("EV1")["host"] == "10.0.0.5"
+    assert restored.get("EV2") is None
+
+
+async def test_seen_again_only_touches_hourly(hass):
+    cache = DiscoveryCache(hass)
+    cache.seen("EV1", "10.0.0.5")
+    first = cache.get("EV1")["last_seen"]
+    cache.seen("EV1", "10.0.0.5")
+    assert cache.get("EV1")["last_seen"] == first
+    cache.seen("EV1", "10.0.0.9")
+    assert cache.get("EV1")["host"] == "10.0.0.9"
+
+
+async def test_resolve_tries_the_cached_address_first(hass, simulator):
+    cache = DiscoveryCache(hass)
+    cache.seen(simulator.serial, simulator.host)
+    assert await cache.async_resolve(simulator.serial, "127.0.0.2", simulator.port) == simulator.host
+
+
+async def test_resolve_scans_neighbours_before_the_rest(hass, monkeypatch):
+    scanned = []
+
+    async def scan_hosts(hosts, port):
+        scanned.append(list(hosts))
+        return [host for host in hosts if host == "10.0.0.200"]
+
+    async def probe_evc(hosts, port):
+        return [{"serial": "EV1", "host": host} for host in hosts]
+
+    monkeypatch.setattr(discovery, "async_scan_hosts", scan_hosts)
+    monkeypatch.setattr(discovery, "async_probe_evc", probe_evc)
+    cache = DiscoveryCache(hass)
+    assert await cache.async_resolve("EV1", "10.0.0.20") == "10.0.0.200"
+    near, far = scanned
+    assert near[:2] == ["10.0.0.19", "10.0.0.21"]
+    assert len(near) == 32
+    assert "10.0.0.20" not in near + far
+    assert len(near) + len(far) == 253
+    assert cache.get("EV1")["host"] == "10.0.0.200"
+
+
+async def test_coordinator_follows_the_charger(hass, simulator, config_entry, setup_entry, monkeypatch):
+    monkeypatch.setattr(coordinator_module, "REDISCOVER_AFTER_FAILURES", 1)
+    monkeypatch.setattr(coordinator_module, "POLL_TIMEOUT_BUDGET", 0.5)
+    coordinator = await setup_entry()
+    coordinator.port = simulator.port
+    # The charger was last seen here, then the entry lost track of it
+    (await async_get_discovery_cache(hass)).seen(simulator.serial, simulator.host)
+    coordinator.host = "127.0.0.2"
+    await coordinator.connection.async_set_host("127.0.0.2")
+
+    coordinator._next_read = dict.fromkeys(coordinator._next_read, 0.0)
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    await coordinator._rediscover_task
+    assert coordinator.host == simulator.host
+    assert config_entry.data["host"] == simulator.host
@@ -0,0 +1,103 @@
+"""Tests for the solar diversion controller."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.givevc.const import (
+    CONF_DIVERSION_MIN_DWELL,
+    CONF_DIVERSION_SOURCE,
+    ROLE_CHARGE_LIMIT,
+    ROLE_CHARGING_STATE,
+)
+from custom_components.givevc.diversion import DiversionController, _export_watts
+
+SOURCE = "sensor.grid_export"
+LIMIT = {"name": "Charge Limit", "register": 91, "min": 6, "max": 32, "step": 1, "scale": 0.1}
+
+
+class _Coordinator:
+    """The parts of ModbusCoordinator the controller uses."""
+
+    def __init__(self):
+        self.roles = {ROLE_CHARGING_STATE: "Charging State", ROLE_CHARGE_LIMIT: "Charge Limit"}
+        self.register_map = SimpleNamespace(by_name={"Charge Limit": LIMIT})
+        self.values = {"Charging State": "charging", "Charge Limit": 16.0}
+        self.listeners = []
+        self.writes = []
+
+    def async_add_listener(self, update):
+        self.listeners.append(update)
+        return lambda: self.listeners.remove(update)
+
+    async def async_write_registers(self, address, values):
+        self.writes.append((address, values))
+
+
+@pytest.fixture
+def coordinator():
+    return _Coordinator()
+
+
+@pytest.fixture
+def controller(hass, coordinator):
+    hass.states.async_set(SOURCE, "0", {"unit_of_measurement": "W"})
+    controller = DiversionController(
+        hass, coordinator, {CONF_DIVERSION_SOURCE: SOURCE, CONF_DIVERSION_MIN_DWELL: 0}
+    )
+    controller.async_start()
+    yield controller
+    controller.async_stop()
+
+
+def test_export_watts():
+    def state(value, unit):
+        return SimpleNamespace(state=value, attributes={"unit_of_measurement": unit})
+
+    assert _export_watts(state("1.5", "kW")) == 1500
+    assert _export_watts(state("-200", "W")) == -200
+    assert _export_watts(state("unavailable", "W")) is None
+    assert _export_watts(state("n/a", "W")) is None
+    assert _export_watts(None) is None
+
+
+async def test_steps_when_export_changes(hass, coordinator, controller):
+    # 1380 W over one phase is 6 A of surplus; Kp 0.5 adds 3 A to the 16 A limit
+    hass.states.async_set(SOURCE, "1380", {"unit_of_measurement": "W"})
+    await hass.async_block_till_done()
+    assert coordinator.writes == [(91, [190])]
+    assert controller.last_written == 19
+    assert controller.as_dict()["active"]
+
+
+async def test_hysteresis_holds_small_changes(hass, coordinator, controller):
+    hass.states.async_set(SOURCE, "200", {"unit_of_measurement": "W"})
+    await hass.async_block_till_done()
+    assert controller.output == 16
+    assert coordinator.writes == []
+
+
+async def test_output_is_clamped(hass, coordinator, controller):
+    hass.states.async_set(SOURCE, "-20", {"unit_of_measurement": "kW"})
+    await hass.async_block_till_done()
+    assert coordinator.writes == [(91, [60])]
+
+
+async def test_idle_charger_resets(hass, coordinator, controller):
+    hass.states.async_set(SOURCE, "1380", {"unit_of_measurement": "W"})
+    await hass.async_block_till_done()
+    coordinator.values["Charging State"] = "idle"
+    for listener in coordinator.listeners:
+        listener()
+    hass.states.async_set(SOURCE, "2760", {"unit_of_measurement": "W"})
+    await hass.async_block_till_done()
+    assert len(coordinator.writes) == 1
+    assert not controller.as_dict()["active"]
+
+
+async def test_stop_unsubscribes(hass, coordinator, controller):
+    controller.async_stop()
+    assert coordinator.listeners == []
+    hass.states.async_set(SOURCE, "1380", {"unit_of_measurement": "W"})
+    await hass.async_block_till_done()
+    assert coordinator.writes == []
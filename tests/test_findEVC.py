@@ -0,0 +1,53 @@
+"""Tests for subnet discovery."""
+
+import asyncio
+import random
+
+from custom_components.givevc import findEVC
+from custom_components.givevc.findEVC import (
+    async_discover_evc,
+    async_get_serial,
+    async_probe_evc,
+    async_scan_hosts,
+)
+
+
+async def test_scan_streams_hosts_and_keeps_their_order(monkeypatch):
+    open_hosts = {"10.0.0.3", "10.0.0.7", "10.0.0.12"}
+    pulled = []
+
+    async def port_open(loop, host, port, timeout):
+        # Answers arrive out of order
+        await asyncio.sleep(random.uniform(0, 0.01))
+        return host in open_hosts
+
+    def hosts():
+        for index in range(1, 21):
+            pulled.append(index)
+            yield f"10.0.0.{index}"
+
+    monkeypatch.setattr(findEVC, "_port_open", port_open)
+    found = await async_scan_hosts(hosts(), concurrency=4)
+    assert found == ["10.0.0.3", "10.0.0.7", "10.0.0.12"]
+    assert pulled == list(range(1, 21))
+
+
+async def test_scan_finds_an_open_port(simulator):
+    assert await async_scan_hosts([simulator.host], simulator.port) == [simulator.host]
+    assert await async_scan_hosts([], simulator.port) == []
+
+
+async def test_probe_identifies_chargers(simulator):
+    assert await async_get_serial(simulator.host, simulator.port) == simulator.serial
+    found = await async_probe_evc([simulator.host], simulator.port, timeout=1)
+    assert found == [{"serial": simulator.serial, "host": simulator.host}]
+
+
+async def test_probe_skips_devices_without_a_serial(simulator):
+    simulator.registers[38:70] = [0] * 32
+    assert await async_probe_evc([simulator.host], simulator.port, timeout=1) == []
+
+
+async def test_discover_subnet(simulator):
+    found = await async_discover_evc(f"{simulator.host}/32", simulator.port)
+    assert found == [{"serial": simulator.serial, "host": simulator.host}]
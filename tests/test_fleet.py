@@ -0,0 +1,120 @@
+"""Tests for the fleet scheduler."""
+
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.givevc import fleet
+from custom_components.givevc.fleet import FleetScheduler, async_get_fleet
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class _Coordinator:
+    """The parts of ModbusCoordinator the scheduler drives."""
+
+    def __init__(self, entry_id, interval=20):
+        self.entry = SimpleNamespace(entry_id=entry_id)
+        self.host = entry_id
+        self.poll_interval = timedelta(seconds=interval)
+        self.polls = 0
+        self.release = None
+
+    async def async_refresh(self):
+        self.polls += 1
+        if self.release is not None:
+            await self.release.wait()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(fleet, "time", clock)
+    return clock
+
+
+def _fire(scheduler):
+    """Run the scheduler's timer now instead of waiting for it."""
+    scheduler._unsub_timer()
+    scheduler._async_tick(None)
+
+
+async def _tick(hass, scheduler):
+    _fire(scheduler)
+    await hass.async_block_till_done()
+
+
+async def test_polls_are_spread_across_the_interval(hass, clock):
+    scheduler = FleetScheduler(hass)
+    coordinators = [_Coordinator(f"entry{index}") for index in range(4)]
+    for coordinator in coordinators:
+        scheduler.add(coordinator)
+    assert [scheduler._next_poll[f"entry{index}"] - clock.now for index in range(4)] == [5, 10, 15, 20]
+
+    clock.now += 11
+    await _tick(hass, scheduler)
+    assert [coordinator.polls for coordinator in coordinators] == [1, 1, 0, 0]
+    # Each keeps its phase for the next round
+    assert scheduler._next_poll["entry0"] == 1025
+
+    for coordinator in coordinators:
+        scheduler.remove(coordinator)
+    assert scheduler._unsub_timer is None
+
+
+async def test_slow_poll_is_not_overlapped(hass, clock):
+    scheduler = FleetScheduler(hass)
+    coordinator = _Coordinator("entry0")
+    coordinator.release = asyncio.Event()
+    scheduler.add(coordinator)
+    clock.now += 20
+    _fire(scheduler)
+    await asyncio.sleep(0)
+    clock.now += 20
+    _fire(scheduler)
+    assert coordinator.polls == 1
+    coordinator.release.set()
+    await hass.async_block_till_done()
+    clock.now += 20
+    await _tick(hass, scheduler)
+    assert coordinator.polls == 2
+    scheduler.remove(coordinator)
+
+
+async def test_reschedule_brings_a_poll_forward(hass, clock):
+    scheduler = FleetScheduler(hass)
+    coordinator = _Coordinator("entry0")
+    scheduler.add(coordinator)
+    scheduler.async_reschedule(coordinator, 2)
+    assert scheduler._next_poll["entry0"] == clock.now + 2
+    scheduler.async_reschedule(coordinator, 10)
+    assert scheduler._next_poll["entry0"] == clock.now + 2
+    scheduler.remove(coordinator)
+
+
+async def test_transactions_are_capped(hass):
+    scheduler = FleetScheduler(hass, max_inflight=2)
+
+    async def transaction(ok):
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(isError=lambda: not ok)
+
+    await asyncio.gather(*(scheduler.async_transact(transaction, index != 0) for index in range(6)))
+    assert scheduler.peak_inflight == 2
+    assert scheduler.inflight == 0
+    stats = scheduler.stats()
+    assert stats["transactions"] == 6
+    assert stats["errors"] == 1
+    assert stats["latency_mean_ms"] >= 10
+
+
+async def test_one_scheduler_per_instance(hass):
+    assert async_get_fleet(hass) is async_get_fleet(hass)
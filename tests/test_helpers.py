@@ -0,0 +1,92 @@
+"""Tests for the register decoding helpers."""
+
+import struct
+from array import array
+
+import pytest
+
+from custom_components.givevc.helpers import (
+    compile_specs,
+    decode_batch,
+    decode_float,
+    decode_signed_32,
+    decode_unsigned_32,
+    encode_32,
+)
+
+# 0x12345678 as it arrives in each byte order
+BYTE_ORDER_WORDS = {
+    "ABCD": [0x1234, 0x5678],
+    "DCBA": [0x7856, 0x3412],
+    "BADC": [0x3412, 0x7856],
+    "CDAB": [0x5678, 0x1234],
+}
+
+
+@pytest.mark.parametrize("byte_order", BYTE_ORDER_WORDS)
+def test_byte_orders(byte_order):
+    image = array("H", BYTE_ORDER_WORDS[byte_order])
+    specs = compile_specs([(0, "u32", byte_order, 1)])
+    assert decode_batch(image, specs) == [0x12345678]
+
+
+def test_types_and_scale():
+    pi = struct.unpack(">2H", struct.pack(">f", 3.5))
+    image = array("H", [0xFFFE, 1234, *pi, 0xFFFF, 0xFFFF])
+    specs = compile_specs(
+        [
+            (0, "s16", None, 1),
+            (0, "u16", None, 1),
+            (1, "u16", None, 0.1),
+            (2, "float32", "ABCD", 1),
+            (4, "s32", None, 1),
+            (4, "u32", None, 1),
+        ]
+    )
+    assert decode_batch(image, specs) == [-2, 0xFFFE, pytest.approx(123.4), 3.5, -1, 0xFFFFFFFF]
+
+
+def test_outside_image_is_none():
+    specs = compile_specs([(1, "u16", None, 1), (1, "u32", "CDAB", 1), (2, "u16", None, 1)])
+    assert decode_batch(array("H", [1, 2]), specs) == [2, None, None]
+
+
+def test_inputs():
+    specs = compile_specs([(0, "u32", "CDAB", 1), (1, "u16", None, 1)])
+    expected = [0x12345678, 0x1234]
+    assert decode_batch([0x5678, 0x1234], specs) == expected
+    assert decode_batch(bytes([0x56, 0x78, 0x12, 0x34]), specs) == expected
+
+
+def test_image_is_not_modified():
+    image = array("H", [0x1234, 0x5678])
+    decode_batch(image, compile_specs([(0, "u32", "ABCD", 1), (0, "u32", "BADC", 1)]))
+    assert image == array("H", [0x1234, 0x5678])
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        (-1, "u16", None, 1),
+        (0, "u64", None, 1),
+        (0, "u32", "ABDC", 1),
+    ],
+)
+def test_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        compile_specs([spec])
+
+
+def test_two_register_helpers():
+    assert decode_float(list(struct.unpack(">2H", struct.pack(">f", -1.25)))) == -1.25
+    assert decode_unsigned_32([0x5678, 0x1234], "CDAB") == 0x12345678
+    assert decode_signed_32([0xFFFF, 0xFFFE]) == -2
+
+
+@pytest.mark.parametrize("byte_order", BYTE_ORDER_WORDS)
+def test_encode_is_the_inverse_of_decode(byte_order):
+    assert encode_32(0x12345678, "u32", byte_order) == BYTE_ORDER_WORDS[byte_order]
+    for value_type, value in (("s32", -123456), ("u32", 4000000000), ("float32", -2.5)):
+        registers = encode_32(value, value_type, byte_order)
+        specs = compile_specs([(0, value_type, byte_order, 1)])
+        assert decode_batch(registers, specs) == [value]
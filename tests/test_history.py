@@ -0,0 +1,79 @@
+"""Tests for the register history ring buffer."""
+
+import csv
+import gzip
+
+import pytest
+
+from custom_components.givevc.history import RegisterHistory, downsample, write_csv
+
+
+@pytest.fixture
+def current_image(image):
+    """Return ``image`` with Current set to ``current`` raw."""
+
+    def make(current):
+        registers = image[:]
+        registers[1] = current
+        return registers
+
+    return make
+
+
+def test_rows_are_normalised_and_scaled(register_map, image):
+    history = RegisterHistory(register_map, capacity=4)
+    assert history.addresses == {1, 2, 3, 4, 14, 15}
+    history.append(100.0, image)
+    assert len(history) == 1
+    assert list(history.rows()) == [(100.0, [pytest.approx(12.3), -1, pytest.approx(6555.2), 0x00010002])]
+
+
+def test_ring_wraps_in_time_order(register_map, current_image):
+    history = RegisterHistory(register_map, capacity=3)
+    for second in range(5):
+        history.append(float(second), current_image(second * 10))
+    assert len(history) == 3
+    assert [(timestamp, values[0]) for timestamp, values in history.rows()] == [
+        (2.0, 2.0),
+        (3.0, 3.0),
+        (4.0, 4.0),
+    ]
+    assert [timestamp for timestamp, _ in history.rows(start=2.5, end=3.5)] == [3.0]
+
+
+def test_snapshot_is_independent(register_map, current_image):
+    history = RegisterHistory(register_map, capacity=3)
+    history.append(1.0, current_image(10))
+    snapshot = history.snapshot()
+    history.append(2.0, current_image(20))
+    assert len(snapshot) == 1
+    assert [timestamp for timestamp, _ in snapshot.rows()] == [1.0]
+
+
+def test_no_history_columns(register_map, image):
+    history = RegisterHistory(register_map.platform("number"))
+    history.append(1.0, image)
+    assert len(history) == 0
+    assert list(history.rows()) == []
+
+
+def test_downsample():
+    rows = [(0.0, [1.0]), (5.0, [3.0]), (10.0, [2.0])]
+    assert list(downsample(rows, 10)) == [(0.0, 2, [1.0], [3.0], [2.0]), (10.0, 1, [2.0], [2.0], [2.0])]
+
+
+def test_write_csv(tmp_path, register_map, current_image):
+    history = RegisterHistory([register_map.by_name["Current"]], capacity=4)
+    for second in range(3):
+        history.append(float(second), current_image(second * 10))
+    path = tmp_path / "history.csv.gz"
+    assert write_csv(path, history) == 3
+    with gzip.open(path, "rt", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["time", "Current"]
+    assert rows[1] == ["1970-01-01T00:00:00.000+00:00", "0.0"]
+    assert write_csv(path, history, bucket=2) == 2
+    with gzip.open(path, "rt", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["time", "samples", "Current min", "Current max", "Current mean"]
+    assert rows[1] == ["1970-01-01T00:00:00.000+00:00", "2", "0.0", "1.0", "0.5"]
@@ -0,0 +1,65 @@
+"""Tests for the poll metrics."""
+
+from custom_components.givevc.metrics import PollMetrics, RollingHistogram, read_bytes, write_bytes
+
+
+def test_wire_sizes():
+    # Request: MBAP + function, address, count; response: MBAP + function,
+    # byte count and the registers
+    assert read_bytes(10) == 12 + 29
+    assert write_bytes(2) == 17 + 12
+
+
+def test_histogram_summary():
+    histogram = RollingHistogram()
+    for ms in range(1, 101):
+        histogram.add(ms / 1000)
+    summary = histogram.summary()
+    assert summary["count"] == 100
+    assert summary["mean_ms"] == 50.5
+    assert summary["p50_ms"] == 50.0
+    assert summary["p95_ms"] == 95.0
+    assert summary["max_ms"] == 100.0
+    assert summary["last_ms"] == 100.0
+    buckets = histogram.histogram()
+    assert buckets["le_1"] == 1
+    assert buckets["le_100"] == 50
+    assert buckets["inf"] == 0
+    assert sum(buckets.values()) == 100
+
+
+def test_empty_histogram():
+    histogram = RollingHistogram()
+    assert histogram.summary()["mean_ms"] is None
+    assert histogram.percentile(0.5) is None
+    assert histogram.mean() is None
+
+
+def test_window_drops_old_samples():
+    histogram = RollingHistogram(window=-1)
+    histogram.add(0.001)
+    assert histogram.recent() == []
+    assert histogram.total == 1
+
+
+def test_polls_with_nothing_due_are_not_counted():
+    metrics = PollMetrics()
+    assert metrics.success_rate() is None
+    metrics.record_poll(True, 0.01, 3)
+    metrics.record_poll(True, 0.0001, 0)
+    metrics.record_poll(False, 0.5, 0, "timeout")
+    assert metrics.success_rate() == 50.0
+    assert metrics.poll.summary()["count"] == 1
+    assert len(metrics.history) == 3
+    assert metrics.history[-1]["error"] == "timeout"
+
+
+def test_reads_and_writes():
+    metrics = PollMetrics()
+    metrics.record_read(0, 10, 0.002)
+    metrics.record_read(0, 10, 0.004)
+    metrics.record_write(2)
+    assert metrics.bytes_transferred == 2 * read_bytes(10) + write_bytes(2)
+    stats = metrics.as_dict()
+    assert stats["blocks"]["0+10"]["count"] == 2
+    assert stats["block_rtt"]["max_ms"] == 4.0
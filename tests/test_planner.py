@@ -0,0 +1,105 @@
+"""Tests for the read planner."""
+
+from homeassistant import data_entry_flow
+import pytest
+import voluptuous as vol
+
+from custom_components.givevc.const import (
+    CONF_MAX_BLOCK_SIZE,
+    CONF_MAX_GAP,
+    DEFAULT_MAX_BLOCK_SIZE,
+    DEFAULT_MAX_GAP,
+)
+from custom_components.givevc.planner import entry_addresses, entry_interval, plan_tiers
+from custom_components.givevc.register_map import MAP_FILE, load_register_map
+
+
+def test_entry_addresses():
+    assert entry_addresses({"register": 10}) == [10]
+    assert entry_addresses({"register": 10, "float": True}) == [10, 11]
+    assert entry_addresses({"register": 10, "byte_order": "CDAB"}) == [10, 11]
+    assert entry_addresses({"type": "timestamp", "register": 5, "register_minute": 6}) == [5, 6]
+    assert entry_addresses({"register": 10, "addresses": [3]}) == [3]
+
+
+def test_blocks_merge_across_small_gaps():
+    register_map = [{"register": 0}, {"register": 3}, {"register": 20, "float": True}]
+    assert plan_tiers(register_map, 30, max_gap=2) == [(0, 4, 30.0), (20, 2, 30.0)]
+    assert plan_tiers(register_map, 30) == [(0, 1, 30.0), (3, 1, 30.0), (20, 2, 30.0)]
+
+
+def test_blocks_respect_the_size_limit():
+    register_map = [{"register": address} for address in range(10)]
+    assert plan_tiers(register_map, 30, max_block_size=4) == [(0, 4, 30.0), (4, 4, 30.0), (8, 2, 30.0)]
+    assert max(count for _, count, _ in plan_tiers(register_map * 20, 30, max_block_size=500)) <= 125
+
+
+def test_bad_entries_are_skipped():
+    register_map = [{"name": "missing"}, {"register": 0x10000}, {"register": 7}]
+    assert plan_tiers(register_map, 30) == [(7, 1, 30.0)]
+
+
+async def test_options_set_the_block_limits(hass, config_entry, setup_entry):
+    result = await hass.config_entries.options.async_init(config_entry.entry_id)
+    assert result["type"] == data_entry_flow.FlowResultType.FORM
+    with pytest.raises(vol.Invalid):
+        await hass.config_entries.options.async_configure(
+            result["flow_id"], {CONF_MAX_BLOCK_SIZE: 126, CONF_MAX_GAP: 0}
+        )
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_MAX_BLOCK_SIZE: 4, CONF_MAX_GAP: 0}
+    )
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert config_entry.options[CONF_MAX_BLOCK_SIZE] == 4
+
+    coordinator = await setup_entry()
+    assert coordinator.max_block_size == 4
+    assert max(count for _, count, _ in coordinator.blocks) <= 4
+
+
+def test_entry_interval():
+    assert entry_interval({}, 30) == 30
+    assert entry_interval({"poll": "fast"}, 30) == 5
+    assert entry_interval({"poll": "fast"}, 2) == 2
+    assert entry_interval({"poll": "slow"}, 30) == 300
+    assert entry_interval({"poll": "slow"}, 600) == 600
+    assert entry_interval({"poll": "static"}, 30) is None
+    assert entry_interval({"poll": "static", "scan_interval": 10}, 30) == 10
+    assert entry_interval({"poll": "sometimes"}, 30) == 30
+
+
+def test_tiers_are_planned_separately():
+    register_map = [
+        {"register": 0, "poll": "fast"},
+        {"register": 1},
+        {"register": 2, "poll": "static"},
+        {"register": 3, "poll": "static"},
+    ]
+    assert plan_tiers(register_map, 30, max_gap=8) == [(0, 1, 5.0), (1, 1, 30.0), (2, 2, None)]
+
+
+def test_shared_address_polls_at_fastest_interval():
+    register_map = [{"register": 4, "poll": "slow"}, {"register": 4, "poll": "fast"}]
+    assert plan_tiers(register_map, 30) == [(4, 1, 5.0)]
+
+
+def test_addresses_inside_a_faster_block_are_not_read_again():
+    register_map = [
+        {"register": 0, "poll": "fast"},
+        {"register": 4},
+        {"register": 6, "poll": "fast"},
+        {"register": 5, "float": True, "poll": "static"},
+        {"register": 6, "poll": "slow"},
+        {"register": 7, "poll": "slow"},
+    ]
+    # 4 sits in the gap the fast block reads through, 5 and 6 inside it,
+    # while 7 is beyond its end
+    assert plan_tiers(register_map, 30, max_gap=8) == [(0, 7, 5.0), (7, 1, 300.0)]
+
+
+def test_bundled_map_reads_each_register_once():
+    blocks = plan_tiers(load_register_map(MAP_FILE), 30, DEFAULT_MAX_BLOCK_SIZE, DEFAULT_MAX_GAP)
+    addresses = [address for start, count, _ in blocks for address in range(start, start + count)]
+    assert len(addresses) == len(set(addresses))
+    # Error Code (register 4) comes with the fast block from register 0
+    assert [block for block in blocks if block[0] <= 4 < block[0] + block[1]] == [(0, 26, 5.0)]
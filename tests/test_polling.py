@@ -0,0 +1,77 @@
+"""Tests for block retries, stale blocks and the poll time budget."""
+
+import time
+
+from custom_components.givevc import coordinator as coordinator_module
+
+
+async def _refresh(coordinator):
+    coordinator._next_read = dict.fromkeys(coordinator._next_read, 0.0)
+    await coordinator.async_refresh()
+
+
+def _failing_reads(coordinator, monkeypatch, fail):
+    """Make reads raise while ``fail(start, attempt)`` is true."""
+    read = coordinator.connection.read_holding_registers
+    attempts = {}
+
+    async def read_holding_registers(start, count, timeout=None):
+        attempts[start] = attempts.get(start, 0) + 1
+        if fail(start, attempts[start]):
+            raise TimeoutError(f"no answer at {start}")
+        return await read(start, count=count, timeout=timeout)
+
+    monkeypatch.setattr(coordinator.connection, "read_holding_registers", read_holding_registers)
+    return attempts
+
+
+async def test_failed_reads_are_retried(setup_entry, monkeypatch):
+    monkeypatch.setattr(coordinator_module, "RETRY_BACKOFF_BASE", 0.01)
+    coordinator = await setup_entry()
+    retries = coordinator.metrics.retries
+    attempts = _failing_reads(coordinator, monkeypatch, lambda start, attempt: attempt == 1)
+    await _refresh(coordinator)
+    assert coordinator.last_update_success
+    assert set(attempts.values()) == {2}
+    assert coordinator.metrics.retries - retries == len(coordinator.blocks)
+    assert not coordinator.stale_blocks
+
+
+async def test_failed_block_keeps_its_values_as_stale(hass, setup_entry, monkeypatch):
+    monkeypatch.setattr(coordinator_module, "RETRY_BACKOFF_BASE", 0.01)
+    coordinator = await setup_entry()
+    block = coordinator.blocks[-1]
+    name = sorted(coordinator._block_names[block])[0]
+    value = coordinator.value(name)
+    failing = True
+    _failing_reads(coordinator, monkeypatch, lambda start, attempt: failing and start == block[0])
+
+    await _refresh(coordinator)
+    # The rest of the poll still counts as a success
+    assert coordinator.last_update_success
+    assert list(coordinator.stale_blocks) == [block]
+    assert coordinator.value(name) == value
+    assert coordinator.stale_since(name) == coordinator.stale_blocks[block]
+    assert coordinator.entities[name].extra_state_attributes == {
+        "stale_since": coordinator.stale_blocks[block].isoformat()
+    }
+    first_failed = coordinator.stale_blocks[block]
+    await _refresh(coordinator)
+    assert coordinator.stale_since(name) == first_failed
+
+    failing = False
+    await _refresh(coordinator)
+    assert not coordinator.stale_blocks
+    assert coordinator.stale_since(name) is None
+
+
+async def test_poll_stops_at_the_time_budget(simulator, setup_entry, monkeypatch):
+    monkeypatch.setattr(coordinator_module, "POLL_TIMEOUT_BUDGET", 0.5)
+    coordinator = await setup_entry()
+    simulator.latency = 0.2
+    started = time.monotonic()
+    await _refresh(coordinator)
+    assert time.monotonic() - started < 0.8
+    # Blocks the budget did not reach are kept as stale
+    assert coordinator.stale_blocks
+    assert len(coordinator.stale_blocks) < len(coordinator.blocks)
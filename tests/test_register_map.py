@@ -0,0 +1,68 @@
+"""Tests for register map validation and compilation."""
+
+import json
+
+from custom_components.givevc.register_map import compile_map, load_register_map
+
+
+def test_compiled_entries(register_map):
+    assert len(register_map) == 12
+    assert register_map.by_name["State"]["lookup"] == {1: "idle", 4: "charging"}
+    assert register_map.by_name["Power"]["addresses"] == [5, 6]
+    assert register_map.by_name["Start"]["addresses"] == [11, 12, 13]
+    assert [config["name"] for config in register_map.platform("switch")] == ["Enabled", "Locked"]
+    assert register_map.platforms == ["sensor", "number", "select", "switch"]
+    assert register_map.platform("binary_sensor") == []
+
+
+def test_registers_and_lookups_are_normalised():
+    register_map = compile_map(
+        [
+            {"name": "Hex", "type": "sensor", "register": "0x0C", "lookup": {"0x1": "on", 2: "off"}},
+            {"name": "Text", "type": "sensor", "register": "7", "lookup": None, "role": "charging_state"},
+        ]
+    )
+    assert register_map.by_name["Hex"]["register"] == 12
+    assert register_map.by_name["Hex"]["lookup"] == {1: "on", 2: "off"}
+    assert "lookup" not in register_map.by_name["Text"]
+    assert register_map.roles == {"charging_state": "Text"}
+
+
+def test_invalid_entries_are_skipped(caplog):
+    register_map = compile_map(
+        [
+            {"name": "Good", "type": "sensor", "register": 1},
+            {"name": "Missing register", "type": "sensor"},
+            {"name": "Too far", "type": "sensor", "register": 0x10000},
+            {"name": "Bad type", "type": "light", "register": 2},
+            {"name": "Bad order", "type": "sensor", "register": 3, "byte_order": "ABDC"},
+            {"name": "Bad lookup", "type": "sensor", "register": 4, "lookup": {"on": "x"}},
+            {"name": "Good", "type": "sensor", "register": 5},
+            "not an entry",
+        ]
+    )
+    assert [config["name"] for config in register_map] == ["Good"]
+    assert register_map.by_name["Good"]["register"] == 1
+    assert "duplicate name 'Good'" in caplog.text
+    assert compile_map({"name": "Good"}).entries == []
+
+
+def test_compiled_once_per_file_version(tmp_path):
+    path = tmp_path / "register_map.json"
+    path.write_text(json.dumps([{"name": "A", "type": "sensor", "register": 1}]))
+    first = load_register_map(path)
+    assert load_register_map(path) is first
+    assert first.digest
+
+    path.write_text(json.dumps([{"name": "B", "type": "sensor", "register": 2}]))
+    second = load_register_map(path)
+    assert second is not first
+    assert second.digest != first.digest
+    assert [config["name"] for config in second] == ["B"]
+
+
+def test_unreadable_files_give_an_empty_map(tmp_path):
+    assert len(load_register_map(tmp_path / "missing.json")) == 0
+    path = tmp_path / "broken.json"
+    path.write_text("[{")
+    assert len(load_register_map(path)) == 0
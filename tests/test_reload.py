@@ -0,0 +1,67 @@
+"""Tests for reloading the register map and options."""
+
+from custom_components.givevc import services
+from custom_components.givevc.const import CONF_ADAPTIVE, DOMAIN, SERVICE_RELOAD_REGISTER_MAP
+from custom_components.givevc.register_map import MAP_FILE, compile_map, load_register_map
+
+
+async def test_register_map_reload_updates_only_changed_entities(hass, simulator, config_entry, setup_entry, monkeypatch):
+    coordinator = await setup_entry()
+    connection = coordinator.connection
+    assert hass.states.get("sensor.error_code") is not None
+    current_l1 = coordinator.entities["Current L1"]
+    current_l2 = coordinator.entities["Current L2"]
+
+    entries = [dict(config) for config in load_register_map(MAP_FILE) if config["name"] != "Error Code"]
+    entries.append({"name": "Spare", "type": "sensor", "register": 200})
+    for config in entries:
+        if config["name"] == "Current L2":
+            config["scale"] = 0.01
+    register_map = compile_map(entries, digest="reloaded")
+    simulator.registers[200] = 42
+
+    async def load(hass):
+        return register_map
+
+    monkeypatch.setattr(services, "async_load_register_map", load)
+    await hass.services.async_call(DOMAIN, SERVICE_RELOAD_REGISTER_MAP, blocking=True)
+    await hass.async_block_till_done()
+
+    assert coordinator.register_map is register_map
+    assert coordinator.connection is connection
+    assert config_entry.data["register_map_version"] == "reloaded"
+    assert hass.states.get("sensor.error_code") is None
+    assert float(hass.states.get("sensor.spare").state) == 42
+    assert coordinator.entities["Current L2"] is not current_l2
+    # Unchanged entities are left alone
+    assert coordinator.entities["Current L1"] is current_l1
+
+    # Reloading the same map again does nothing
+    await hass.services.async_call(DOMAIN, SERVICE_RELOAD_REGISTER_MAP, blocking=True)
+    assert coordinator.register_map is register_map
+
+
+async def test_invalid_map_keeps_the_current_one(hass, setup_entry, monkeypatch):
+    coordinator = await setup_entry()
+    register_map = coordinator.register_map
+
+    async def load(hass):
+        return compile_map([{"name": "Broken"}])
+
+    monkeypatch.setattr(services, "async_load_register_map", load)
+    await hass.services.async_call(DOMAIN, SERVICE_RELOAD_REGISTER_MAP, blocking=True)
+    assert coordinator.register_map is register_map
+
+
+async def test_options_change_reloads_the_entry(hass, config_entry, setup_entry):
+    coordinator = await setup_entry()
+    hass.config_entries.async_update_entry(config_entry, options={CONF_ADAPTIVE: True})
+    await hass.async_block_till_done()
+    reloaded = hass.data[DOMAIN][config_entry.entry_id]
+    assert reloaded is not coordinator
+    assert reloaded.adaptive
+
+    # Other entry updates, such as a new host, leave it running
+    hass.config_entries.async_update_entry(config_entry, data={**config_entry.data, "register_map_version": "x"})
+    await hass.async_block_till_done()
+    assert hass.data[DOMAIN][config_entry.entry_id] is reloaded
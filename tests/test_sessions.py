@@ -0,0 +1,115 @@
+"""Tests for the charging session tracker."""
+
+from datetime import timedelta
+
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.givevc.const import CONF_TARIFF, CONF_TARIFF_ENTITY, SESSION_SAVE_DELAY
+from custom_components.givevc.sessions import SessionTracker, session_summary
+
+HOUR = 3600
+START = 1_700_000_000
+
+
+def _tracker(hass, **options):
+    return SessionTracker(hass, "entry", {CONF_TARIFF: 0.25, **options})
+
+
+async def test_session_lifecycle(hass):
+    tracker = _tracker(hass)
+    # Energy metered before the session starts is not counted
+    assert not tracker.async_update("idle", 10.0, 0, START)
+    assert tracker.async_update("charging", 12.0, 7000, START + HOUR)
+    assert tracker.current["energy_kwh"] == 0.0
+    assert tracker.async_update("charging", 19.0, 7200, START + 2 * HOUR)
+    assert tracker.current["energy_kwh"] == 7.0
+    assert tracker.current["cost"] == 1.75
+    assert tracker.current["peak_power_w"] == 7200
+
+    assert tracker.async_update("idle", 19.5, 0, START + 3 * HOUR)
+    assert tracker.current is None
+    assert tracker.last["energy_kwh"] == 7.5
+    assert tracker.last["end"] == START + 3 * HOUR
+    assert tracker.totals == {"sessions": 1, "energy_kwh": 7.5, "cost": 1.875}
+    await tracker.async_save()
+
+
+async def test_tariff_entity(hass):
+    tracker = _tracker(hass, **{CONF_TARIFF_ENTITY: "sensor.tariff"})
+    assert tracker.price() == 0.25
+    hass.states.async_set("sensor.tariff", "0.1")
+    assert tracker.price() == 0.1
+    hass.states.async_set("sensor.tariff", "unavailable")
+    assert tracker.price() == 0.25
+
+
+async def test_missing_charging_state_keeps_the_step(hass):
+    tracker = _tracker(hass)
+    tracker.async_update("charging", 10.0, None, START)
+    assert not tracker.async_update(None, 11.0, None, START + HOUR)
+    tracker.async_update("charging", 12.0, None, START + 2 * HOUR)
+    assert tracker.current["energy_kwh"] == 2.0
+    await tracker.async_save()
+
+
+async def test_reading_at_time_zero(hass):
+    # A baseline taken at epoch 0 still bounds the next step by its age
+    tracker = _tracker(hass)
+    tracker.async_update("charging", 10.0, None, 0)
+    tracker.async_update("charging", 17.0, None, HOUR)
+    assert tracker.current["energy_kwh"] == 7.0
+    await tracker.async_save()
+
+
+async def test_implausible_steps_are_dropped(hass):
+    tracker = _tracker(hass)
+    tracker.async_update("charging", 10.0, None, START)
+    # A meter reset, then more than the charger can deliver in a minute
+    tracker.async_update("charging", 0.0, None, START + HOUR)
+    tracker.async_update("charging", 5.0, None, START + HOUR + 60)
+    assert tracker.current["energy_kwh"] == 0.0
+    tracker.async_update("charging", 6.0, None, START + 2 * HOUR)
+    assert tracker.current["energy_kwh"] == 1.0
+    await tracker.async_save()
+
+
+async def test_state_is_restored(hass, hass_storage):
+    tracker = _tracker(hass)
+    tracker.async_update("charging", 10.0, None, START)
+    tracker.async_update("charging", 11.0, None, START + HOUR)
+    await tracker.async_save()
+
+    restored = _tracker(hass)
+    await restored.async_load()
+    assert restored.current == tracker.current
+    restored.async_update("charging", 12.0, None, START + 2 * HOUR)
+    assert restored.current["energy_kwh"] == 2.0
+    await restored.async_save()
+
+
+def test_session_summary():
+    session = {"start": 0, "end": HOUR, "energy_kwh": 7.0, "cost": 1.754, "peak_power_w": 7200}
+    summary = session_summary(session)
+    assert summary["duration_s"] == HOUR
+    assert summary["mean_power_w"] == 7000
+    assert summary["cost"] == 1.75
+    assert summary["end"] == "1970-01-01T01:00:00+00:00"
+    assert session_summary(None) is None
+
+
+async def test_sessions_are_saved_while_charging(hass, hass_storage):
+    tracker = _tracker(hass)
+    start = dt_util.utcnow()
+    tracker.async_update("charging", 10.0, 7000, START)
+    # Every poll changes the session; the save is not pushed back by them
+    for minute in range(1, 4):
+        async_fire_time_changed(hass, start + timedelta(seconds=20 * minute))
+        tracker.async_update("charging", 10.0 + minute / 10, 7000, START + 60 * minute)
+    async_fire_time_changed(hass, start + timedelta(seconds=SESSION_SAVE_DELAY + 1))
+    await hass.async_block_till_done()
+    assert hass_storage["givevc.sessions.entry"]["data"]["current"]["start"] == START
+
+    restored = _tracker(hass)
+    await restored.async_load()
+    assert restored.current == tracker.current
@@ -0,0 +1,75 @@
+"""Tests for starting from the saved register image."""
+
+from datetime import timedelta
+
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.givevc import coordinator as coordinator_module
+from custom_components.givevc.fleet import FleetScheduler
+from custom_components.givevc.storage import ThrottledStore
+
+
+async def test_entry_starts_from_the_saved_image(hass, hass_storage, simulator, config_entry, setup_entry, monkeypatch):
+    coordinator = await setup_entry()
+    assert not coordinator.setup_profile["warm_start"]
+    limit = hass.states.get("number.charge_limit").state
+    # Unloading saves the image
+    await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+    saved = hass_storage[f"givevc.image.{config_entry.entry_id}"]["data"]
+    assert saved["register_map_version"] == coordinator.register_map.digest
+
+    # The charger is unreachable, yet the entry loads with the saved values.
+    # Hold back the poll setup starts in the background to see them.
+    await simulator.stop()
+    monkeypatch.setattr(FleetScheduler, "async_reschedule", lambda self, coordinator, delay=0.0: None)
+    coordinator = await setup_entry()
+    assert coordinator.setup_profile["warm_start"]
+    assert coordinator.restored_at is not None
+    assert hass.states.get("number.charge_limit").state == limit
+    assert set(coordinator.stale_blocks) == set(coordinator.blocks)
+    assert "stale_since" in hass.states.get("number.charge_limit").attributes
+
+    # The first poll once the charger is back clears the stale marks
+    await simulator.start()
+    coordinator._next_read = dict.fromkeys(coordinator._next_read, 0.0)
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert not coordinator.stale_blocks
+    assert "stale_since" not in hass.states.get("number.charge_limit").attributes
+
+
+async def test_image_without_a_store_is_not_restored(hass, simulator, register_map):
+    coordinator = coordinator_module.ModbusCoordinator(hass, simulator.host, simulator.port, 1, 30, register_map)
+    assert not await coordinator.async_restore_image()
+    await coordinator.connection.close()
+
+
+async def test_throttled_save_is_not_pushed_back(hass, hass_storage):
+    store = ThrottledStore(hass, 1, "givevc.test")
+    data = {"value": 1}
+    start = dt_util.utcnow()
+    store.async_throttled_save(lambda: dict(data), 300)
+    data["value"] = 2
+    async_fire_time_changed(hass, start + timedelta(seconds=200))
+    store.async_throttled_save(lambda: dict(data), 300)
+    async_fire_time_changed(hass, start + timedelta(seconds=301))
+    await hass.async_block_till_done()
+    assert hass_storage["givevc.test"]["data"] == {"value": 2}
+
+    # The next change schedules a new save
+    data["value"] = 3
+    store.async_throttled_save(lambda: dict(data), 300)
+    async_fire_time_changed(hass, start + timedelta(seconds=602))
+    await hass.async_block_till_done()
+    assert hass_storage["givevc.test"]["data"] == {"value": 3}
+
+    # Saving straight away replaces the pending save
+    store.async_throttled_save(lambda: {"value": 4}, 300)
+    await store.async_save({"value": 5})
+    assert hass_storage["givevc.test"]["data"] == {"value": 5}
+    store.async_throttled_save(lambda: {"value": 6}, 300)
+    async_fire_time_changed(hass, start + timedelta(seconds=903))
+    await hass.async_block_till_done()
+    assert hass_storage["givevc.test"]["data"] == {"value": 6}
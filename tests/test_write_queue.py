@@ -0,0 +1,52 @@
+"""Tests for the write queue."""
+
+import asyncio
+
+from homeassistant.exceptions import HomeAssistantError
+import pytest
+
+from custom_components.givevc.write_queue import contiguous_runs
+
+
+def test_contiguous_runs():
+    assert contiguous_runs({9: 3, 7: 1, 8: 2, 20: 4}) == [(7, [1, 2, 3]), (20, [4])]
+    assert contiguous_runs({address: 0 for address in range(5)}, max_count=2) == [
+        (0, [0, 0]),
+        (2, [0, 0]),
+        (4, [0]),
+    ]
+
+
+async def test_burst_is_coalesced(simulator, setup_entry):
+    coordinator = await setup_entry()
+    queue = coordinator.write_queue
+    requests = simulator.requests
+    results = await asyncio.gather(*(queue.async_write(7, [100 + value]) for value in range(20)))
+    # One batch for the first write, one for everything queued behind it,
+    # each a write and a read-back
+    assert simulator.requests - requests <= 4
+    assert results[-1] == {7: 119}
+    assert simulator.registers[7] == 119
+
+
+async def test_neighbouring_registers_share_a_write(simulator, setup_entry):
+    coordinator = await setup_entry()
+    queue = coordinator.write_queue
+    requests = simulator.requests
+    async with coordinator.io_lock:
+        writes = asyncio.gather(queue.async_write(7, [120]), queue.async_write(8, [1]))
+        await asyncio.sleep(0)
+    assert await writes == [{7: 120, 8: 1}] * 2
+    assert simulator.requests - requests == 2
+
+
+async def test_cancel_fails_waiting_writes(simulator, setup_entry):
+    coordinator = await setup_entry()
+    queue = coordinator.write_queue
+    async with coordinator.io_lock:
+        write = asyncio.ensure_future(queue.async_write(7, [50]))
+        await asyncio.sleep(0)
+        queue.cancel()
+        with pytest.raises(HomeAssistantError):
+            await write
+    assert simulator.registers[7] != 50
@@ -0,0 +1,73 @@
+"""Tests for writes from the number, select and switch entities."""
+
+import asyncio
+from types import SimpleNamespace
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+import pytest
+
+NUMBER = "number.charge_limit"
+SELECT = "select.charge_control"
+
+
+async def _set_limit(hass, value):
+    await hass.services.async_call(
+        "number", "set_value", {"entity_id": NUMBER, "value": value}, blocking=True
+    )
+
+
+async def test_only_real_entities_are_registered(hass, config_entry, setup_entry):
+    await setup_entry()
+    registry = er.async_get(hass)
+    entries = er.async_entries_for_config_entry(registry, config_entry.entry_id)
+    unique_ids = [entry.unique_id for entry in entries]
+    assert len(unique_ids) == len(set(unique_ids))
+    assert registry.async_get(NUMBER).domain == "number"
+    assert registry.async_get(SELECT).domain == "select"
+    assert not [entry for entry in entries if entry.domain == "sensor" and "charge_limit" in entry.unique_id]
+
+
+async def test_value_is_shown_while_the_write_waits(hass, simulator, setup_entry):
+    coordinator = await setup_entry()
+    async with coordinator.io_lock:
+        write = hass.async_create_task(_set_limit(hass, 20))
+        await asyncio.sleep(0.05)
+        assert float(hass.states.get(NUMBER).state) == 20
+        assert simulator.registers[91] != 200
+    await write
+    assert simulator.registers[91] == 200
+    assert float(hass.states.get(NUMBER).state) == 20
+
+    await hass.services.async_call(
+        "select", "select_option", {"entity_id": SELECT, "option": "Stop"}, blocking=True
+    )
+    assert simulator.registers[95] == 2
+    assert hass.states.get(SELECT).state == "Stop"
+
+
+async def test_read_back_shows_what_the_charger_holds(hass, simulator, setup_entry, monkeypatch):
+    coordinator = await setup_entry()
+    before = hass.states.get(NUMBER).state
+
+    async def ignored_write(address, values):
+        # The charger acknowledges the write but keeps its value
+        return SimpleNamespace(isError=lambda: False)
+
+    monkeypatch.setattr(coordinator.connection, "write_registers", ignored_write)
+    await _set_limit(hass, 25)
+    assert hass.states.get(NUMBER).state == before
+
+
+async def test_failed_write_restores_the_value(hass, simulator, setup_entry, monkeypatch):
+    coordinator = await setup_entry()
+    before = hass.states.get(NUMBER).state
+
+    async def failed_write(address, values):
+        raise ConnectionError("no answer")
+
+    monkeypatch.setattr(coordinator.connection, "write_registers", failed_write)
+    with pytest.raises(HomeAssistantError, match="Charge Limit"):
+        await _set_limit(hass, 25)
+    assert hass.states.get(NUMBER).state == before
+    assert coordinator.value("Charge Limit") == float(before)